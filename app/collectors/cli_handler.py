@@ -5,31 +5,38 @@ CLI 명령어를 파싱하여 노드/엣지로 변환합니다.
 새로운 파서 레지스트리 시스템을 사용합니다.
 """
 
-from collectors.cli_parsers import parse_cli
+from collectors.cli_parsers import parse_script
 
 
 def run_cli_collector(cli_input: str, account_id: str) -> dict:
     """
     CLI 명령어를 파싱하여 노드/엣지로 변환
     
+    여러 명령어로 된 스크립트라면 명령어를 순서대로 모두 파싱하여
+    같은 리소스에 대한 변경을 하나의 노드로 누적합니다.
+    
     Args:
-        cli_input: AWS CLI 명령어 문자열 (여러 줄 가능)
+        cli_input: AWS CLI 명령어 문자열 (여러 줄, 여러 명령어 가능)
         account_id: AWS 계정 ID
         
     Returns:
         dict: 파싱된 노드/엣지 데이터
-              {"nodes": [...], "edges": []}
+              {"nodes": [...], "edges": [], "errors": [...]}
+              errors: 파싱에 실패한 명령어 목록 (나머지 명령어의 결과는 그대로 반환)
     """
     if not cli_input or cli_input.strip() == "":
-        return {"nodes": [], "edges": []}
+        return {"nodes": [], "edges": [], "errors": []}
     
     try:
-        # 새로운 파서 레지스트리 사용 (자동 서비스 감지)
-        result = parse_cli(cli_input, account_id)
-        return result
+        # 새로운 파서 레지스트리 사용 (자동 서비스 감지, 명령어별 파싱 후 누적)
+        result = parse_script(cli_input, account_id)
         
     except Exception as e:
         print(f"CLI 파싱 중 오류 발생: {e}")
         import traceback
         traceback.print_exc()
-        return {"nodes": [], "edges": []}
\ No newline at end of file
+        return {"nodes": [], "edges": [], "errors": [{"command": cli_input, "error": str(e)}]}
+    
+    for error in result["errors"]:
+        print(f"CLI 명령어 파싱 실패: {error['error']} ({error['command'][:100]})")
+    return result
\ No newline at end of file
@@ -4,11 +4,12 @@ CLI Parsers Module
 AWS CLI 명령어를 파싱하여 노드/엣지 형식으로 변환하는 파서들의 모음입니다.
 """
 
-from .parser_registry import parse_cli, get_parser, list_supported_services
+from .parser_registry import parse_cli, parse_script, get_parser, list_supported_services
 from .base_parser import BaseParser
 
 __all__ = [
     'parse_cli',
+    'parse_script',
     'get_parser',
     'list_supported_services',
     'BaseParser'
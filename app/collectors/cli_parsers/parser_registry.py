@@ -9,10 +9,11 @@ import importlib
 import inspect
 import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_parser import BaseParser
 
 
+
 class ParserRegistry:
     """
     CLI 파서 저장소입니다.
@@ -157,11 +158,157 @@ class ParserRegistry:
         parser = self.get_parser(service)
         return parser.parse_command(cli_text, account_id, **kwargs)
     
+    def split_script(self, cli_text: str) -> List[str]:
+        """
+        여러 명령어가 들어있는 CLI 스크립트를 명령어 단위로 나눕니다.
+        
+        백슬래시(\\)로 이어진 줄을 먼저 합친 뒤, 따옴표 밖의 문자를 기준으로 나눕니다.
+        - "&&", ";" 로 이어진 명령어는 각각의 명령어로 나눕니다.
+        - 빈 줄과 주석(#)은 건너뜁니다. (따옴표 안의 정책 JSON에 들어있는 #은 그대로 유지)
+        - 따옴표 밖의 줄바꿈은 명령어의 끝입니다. (따옴표 안에서 여러 줄로 작성된 정책 JSON은 그대로 유지)
+        - "aws"로 시작하지 않는 줄(sleep, echo, export 등)도 하나의 명령어로 나누며,
+          parse_script에서 파싱 실패(errors)로 남기므로 앞 명령어에 섞이지 않습니다.
+        
+        Args:
+            cli_text: AWS CLI 스크립트 문자열
+            
+        Returns:
+            List[str]: 명령어 문자열 리스트 (입력 순서 유지)
+        """
+        text = re.sub(r"\\[ \t]*\r?\n", " ", cli_text)
+        
+        commands: List[str] = []
+        current: List[str] = []
+        quote = None  # 현재 열려 있는 따옴표 (' 또는 ")
+        
+        def flush():
+            command = "".join(current).strip()
+            if command:
+                commands.append(command)
+            current.clear()
+        
+        i, length = 0, len(text)
+        while i < length:
+            char = text[i]
+            if quote:
+                current.append(char)
+                if char == "\\" and quote == '"' and i + 1 < length:  # 큰따옴표 안의 이스케이프 문자
+                    current.append(text[i + 1])
+                    i += 2
+                    continue
+                if char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+                current.append(char)
+            elif char == "#" and (not current or current[-1] in " \t\r\n"):
+                # 주석은 줄 끝까지 무시
+                end = text.find("\n", i)
+                i = length if end == -1 else end
+                continue
+            elif char == ";" or text.startswith("&&", i):
+                flush()
+                i += 1 if char == ";" else 2
+                continue
+            elif char == "\n":
+                flush()
+            else:
+                current.append(char)
+            i += 1
+        flush()
+        
+        return commands
+    
+    def parse_script(self, cli_text: str, account_id: str, **kwargs) -> Dict:
+        """
+        여러 명령어로 된 CLI 스크립트를 한 번에 파싱하고 누적된 최종 상태로 합칩니다.
+        
+        같은 리소스(node_type, name)를 다루는 명령어들의 결과는 하나의 노드로 합칩니다.
+        (예: create-role -> put-role-policy -> attach-role-policy 는 정책이 모두 반영된 Role 노드 하나)
+        파싱에 실패한 명령어는 건너뛰고 errors에 남기며, 나머지 명령어의 결과는 그대로 반환합니다.
+        
+        Args:
+            cli_text: AWS CLI 스크립트 문자열 (명령어 하나여도 됨)
+            account_id: AWS 계정 ID
+            **kwargs: 추가 파라미터
+            
+        Returns:
+            dict: 파싱된 노드/엣지 데이터 (노드는 처음 등장한 순서)
+                  errors: 파싱에 실패한 명령어 목록 [{"command": ..., "error": ...}]
+        """
+        folded: Dict[tuple, Dict] = {}
+        edges: List[Dict] = []
+        errors: List[Dict] = []
+        
+        for command in self.split_script(cli_text):
+            try:
+                result = self.parse(command, account_id, **kwargs)
+            except Exception as e:
+                errors.append({"command": command, "error": str(e)})
+                continue
+            edges.extend(result.get("edges", []))
+            for node in result.get("nodes", []):
+                key = (node.get("node_type"), node.get("name"))
+                if key in folded:
+                    folded[key] = _fold_node(folded[key], node)
+                else:
+                    folded[key] = node
+        
+        return {
+            "schema_version": "1.0",
+            "collected_at": BaseParser._iso_now(),
+            "account_id": account_id,
+            "nodes": list(folded.values()),
+            "edges": edges,
+            "errors": errors
+        }
+    
     def list_services(self) -> list:
         """현재 등록된 모든 서비스 목록을 반환합니다."""
         return list(self._parsers.keys())
 
 
+def _fold_node(base: Dict, node: Dict) -> Dict:
+    """
+    같은 리소스에 대한 두 노드를 뒤 명령어 기준으로 누적하여 합칩니다.
+    
+    - node_id는 먼저 등장한 노드의 값을 유지합니다.
+    - inline_policies: PolicyName 기준 (같은 이름은 뒤 명령어로 덮어쓰기)
+    - attached_policies: PolicyArn 기준 (중복 제거)
+    - group_policies, groups, raw_refs.source: 순서대로 이어 붙임 (groups는 중복 제거)
+    - 그 외 속성: 뒤 명령어에 값이 있으면 덮어쓰기 (assume_role_policy 등)
+    """
+    merged = dict(base)
+    attrs = dict(base.get("attributes", {}))
+    
+    for key, value in node.get("attributes", {}).items():
+        if key == "inline_policies":
+            by_name = {p["PolicyName"]: p for p in attrs.get(key, [])}
+            by_name.update({p["PolicyName"]: p for p in value})
+            attrs[key] = list(by_name.values())
+        elif key == "attached_policies":
+            by_arn = {p["PolicyArn"]: p for p in attrs.get(key, [])}
+            for p in value:
+                by_arn.setdefault(p["PolicyArn"], p)
+            attrs[key] = list(by_arn.values())
+        elif key == "group_policies":
+            attrs[key] = list(attrs.get(key, [])) + list(value)
+        elif key == "groups":
+            attrs[key] = list(dict.fromkeys(list(attrs.get(key, [])) + list(value)))
+        elif key == "create_date":
+            attrs.setdefault(key, value)
+        elif value or key not in attrs:
+            attrs[key] = value
+    
+    merged["attributes"] = attrs
+    
+    raw_refs = dict(base.get("raw_refs", {}))
+    raw_refs["source"] = list(raw_refs.get("source", [])) + list(node.get("raw_refs", {}).get("source", []))
+    merged["raw_refs"] = raw_refs
+    
+    return merged
+
+
 # 전역 레지스트리 인스턴스 (싱글톤 패턴)
 # 프로그램 실행 시 한 번만 만들어져서 계속 사용됩니다.
 _registry = ParserRegistry()
@@ -181,6 +328,20 @@ def parse_cli(cli_text: str, account_id: str, **kwargs) -> Dict:
     return _registry.parse(cli_text, account_id, **kwargs)
 
 
+def parse_script(cli_text: str, account_id: str, **kwargs) -> Dict:
+    """
+    외부에서 여러 명령어로 된 CLI 스크립트를 파싱하기 위한 헬퍼 함수입니다.
+    
+    Args:
+        cli_text: AWS CLI 스크립트 문자열 (명령어 하나여도 됨)
+        account_id: AWS 계정 ID
+    
+    Returns:
+        dict: 명령어들의 결과가 누적되어 합쳐진 노드/엣지 데이터
+    """
+    return _registry.parse_script(cli_text, account_id, **kwargs)
+
+
 def get_parser(service: str) -> BaseParser:
     """
     외부에서 특정 서비스 파서를 가져오기 위한 헬퍼 함수입니다.
@@ -1,26 +1,63 @@
 from datetime import datetime, timezone
 import boto3
+import botocore
 
 from collectors.ec2_collectors import collect_ec2
 from collectors.lambda_collectors import collect_lambda
 from collectors.iam_user_collectors import collect_iam_user
 from collectors.iam_role_collectors import collect_iam_role
+from collectors.iam_bulk_collectors import collect_iam_bulk
 from collectors.sqs_collectors import collect_sqs
 from collectors.rds_collectors import collect_rds
 from collectors.network_collectors import collect_network
 from collectors.secretsmanager_collectors import collect_secretsmanager
+from collectors.policy_cache import ManagedPolicyCache
+from collectors.worker_pool import run_tasks, DEFAULT_MAX_WORKERS
+from collectors.session_pool import AssumedRoleSessionPool
+from collectors.rate_limiter import install_rate_limiter, RetryBudget, DEFAULT_RETRY_BUDGET
+from collectors.snapshot_store import snapshot_path, load_snapshot, save_snapshot
 
-def handler(event, session):
-    #event(payload)에서 계정 id, region을 받아옴
-    account_id = event["account_id"]
-    region = event["region"]
+#여러 계정 수집 시 기본 동시 수집 계정 수
+DEFAULT_ACCOUNT_MAX_WORKERS = 10
 
-    #시간 기록
-    collected_at = event.get(
-        "collected_at",
-        datetime.now(timezone.utc).isoformat()
-    )
+#리전 서비스별 수집 작업 목록 (session을 받아 해당 서비스의 raw data를 반환하는 함수)
+#previous(이전 수집 결과)가 있으면 변경되지 않은 리소스의 상세 조회(user data, 리소스 기반 정책)를 생략하고 이전 값을 재사용
+def _regional_tasks(event, region, previous=None):
+    previous = previous or {}
+    return {
+        "ec2": lambda session: collect_ec2(session, region, event.get("ec2_max_workers", 1), event.get("ec2_skip_inactive", False), previous.get("ec2")),
+        "lambda": lambda session: collect_lambda(session, region, previous.get("lambda")),
+        "sqs": lambda session: collect_sqs(session, region),
+        "rds": lambda session: collect_rds(session, region),
+        "network": lambda session: collect_network(session, region),
+        "secretsmanager": lambda session: collect_secretsmanager(session, region, previous.get("secretsmanager"))
+    }
+
+#IAM(글로벌 서비스) 수집 작업 목록
+def _iam_tasks(event):
+    iam_max_workers = event.get("iam_max_workers", 1) #IAM User별 상세 조회 동시 실행 수 (1이면 순차 조회)
+    default_only = event.get("policy_versions") == "default" #관리형 정책의 Default 버전 문서만 수집할지 여부
+
+    if event.get("iam_mode") == "bulk": #GetAccountAuthorizationDetails 기반으로 User/Role을 한 번에 수집
+        return {"iam": lambda session: collect_iam_bulk(session, default_only)}
 
+    #기본은 User/Role별 API 호출로 수집
+    #User, Group, Role이 같은 관리형 정책 문서 캐시를 공유 (policy_cache_dir이 있으면 디스크 캐시도 사용)
+    policy_cache = ManagedPolicyCache(event.get("policy_cache_dir"), default_only)
+    return {
+        "iam_user": lambda session: collect_iam_user(session, iam_max_workers, policy_cache),
+        "iam_role": lambda session: collect_iam_role(session, policy_cache)
+    }
+
+#수집 작업 실행
+def _run(tasks, event, session):
+    if event.get("concurrent"): #동시 수집 모드라면 서비스별 수집을 스레드 풀에서 병렬로 실행 (워커마다 별도 Session/client 사용)
+        return run_tasks(tasks, session, event.get("max_workers", DEFAULT_MAX_WORKERS))
+    #기본은 서비스 순서대로 하나씩 수집
+    return {name: task(session) for name, task in tasks.items()}
+
+#수집 결과를 리전 하나의 최종 반환 구조로 정리
+def _build_result(account_id, region, collected_at, collected):
     #최종적으로 반환될 딕셔너리 구조
     result = {
         "account_id": account_id, #계정 id
@@ -30,18 +67,145 @@ def handler(event, session):
     }
 
     #딕셔너리에 추가될 서비스 리스트들
-    result["ec2"] = collect_ec2(session, region)
-    result["lambda"] = collect_lambda(session, region)
-    result["iam_user"] = collect_iam_user(session)
-    result["iam_role"] = collect_iam_role(session)
-    result["sqs"] = collect_sqs(session, region)
-    result["rds"] = collect_rds(session, region)
-    network = []
-    network = collect_network(session, region)
+    result["ec2"] = collected["ec2"]
+    result["lambda"] = collected["lambda"]
+    iam = collected.get("iam", collected) #bulk 모드라면 iam_user, iam_role이 함께 반환됨
+    result["iam_user"] = iam["iam_user"]
+    result["iam_role"] = iam["iam_role"]
+    result["sqs"] = collected["sqs"]
+    result["rds"] = collected["rds"]
+    network = collected["network"]
     result["vpc"] = network["vpc"]
     result["subnet"] = network["subnet"]
     result["igw"] = network["igw"]
     result["route_table"] = network["route_table"]
-    result["secretsmanager"] = collect_secretsmanager(session, region)
+    result["secretsmanager"] = collected["secretsmanager"]
+
+    return result
+
+#증분 수집용 스냅샷 경로 (snapshot_dir이 없으면 None -> 매번 전체 수집)
+def _snapshot_path(event, account_id, region):
+    if not event.get("snapshot_dir"):
+        return None
+    return snapshot_path(event["snapshot_dir"], account_id, region)
+
+def handler(event, session):
+    #event(payload)에서 계정 id, region을 받아옴
+    account_id = event["account_id"]
+    region = event["region"]
+
+    #시간 기록
+    collected_at = event.get(
+        "collected_at",
+        datetime.now(timezone.utc).isoformat()
+    )
+
+    install_rate_limiter(event, session) #이 Session(및 워커 Session)에서 만드는 모든 client에 서비스별 속도 제한, 재시도 예산 적용
+
+    path = _snapshot_path(event, account_id, region)
+    previous = load_snapshot(path) if path else None #이전 수집 결과 (증분 수집)
+
+    tasks = {**_regional_tasks(event, region, previous), **_iam_tasks(event)}
+    collected = _run(tasks, event, session)
+
+    result = _build_result(account_id, region, collected_at, collected)
+    if path: #다음 수집에서 재사용할 수 있도록 이번 결과 저장
+        save_snapshot(path, result)
+    return result
+
+#여러 리전을 한 번에 수집
+#- IAM은 글로벌 서비스이므로 한 번만 수집하여 모든 리전 결과에 같은 값을 넣어둠
+#- 리전별 수집은 리전마다 별도 Session을 사용하여 병렬로 실행 (region_max_workers로 동시 실행 수 제한)
+def handler_multi_region(event, session):
+    account_id = event["account_id"]
+    regions = event["regions"]
+
+    #시간 기록
+    collected_at = event.get(
+        "collected_at",
+        datetime.now(timezone.utc).isoformat()
+    )
+
+    install_rate_limiter(event, session) #모든 리전이 같은 limiter를 공유
+
+    iam_collected = _run(_iam_tasks(event), event, session) #IAM은 한 번만 수집
+
+    def region_task(region):
+        def collect(region_session):
+            path = _snapshot_path(event, account_id, region)
+            previous = load_snapshot(path) if path else None #이전 수집 결과 (증분 수집)
+            collected = _run(_regional_tasks(event, region, previous), event, region_session)
+            collected.update(iam_collected)
+            result = _build_result(account_id, region, collected_at, collected)
+            if path:
+                save_snapshot(path, result)
+            return result
+        return collect
+
+    per_region = run_tasks(
+        {region: region_task(region) for region in regions},
+        session,
+        event.get("region_max_workers", len(regions))
+    )
+
+    iam = iam_collected.get("iam", iam_collected)
+    return {
+        "account_id": account_id, #계정 id
+        "regions": per_region, #리전 -> 해당 리전의 수집 결과 (handler와 같은 구조)
+        "collected_at": collected_at, #시간
+        "iam_user": iam["iam_user"], #글로벌 IAM 수집 결과 (모든 리전 결과와 같은 객체를 공유)
+        "iam_role": iam["iam_role"]
+    }
+
+#여러 계정(Organization 멤버 계정 등)을 한 번에 수집
+#- 각 계정의 role_name Role을 AssumeRole하여 수집 (자격 증명은 계정별로 캐시되고 만료 전에 자동 갱신)
+#- 계정별 수집은 account_max_workers 개수만큼만 동시에 실행
+#- 계정마다 regions가 있으면 handler_multi_region, 없으면 handler와 같은 구조로 수집
+#- AssumeRole 실패 등으로 수집하지 못한 계정은 errors에 기록하고 나머지 계정은 계속 수집
+def handler_multi_account(event, session):
+    account_ids = event["account_ids"]
+
+    #시간 기록
+    collected_at = event.get(
+        "collected_at",
+        datetime.now(timezone.utc).isoformat()
+    )
+
+    install_rate_limiter(event, session) #AssumeRole(STS) 호출에도 속도 제한 적용
+    budget = RetryBudget(event.get("retry_budget", DEFAULT_RETRY_BUDGET)) #재시도 예산은 모든 계정이 공유
+
+    pool = AssumedRoleSessionPool(
+        session,
+        event["role_name"],
+        event.get("role_session_name", "aws-infra-inventory"),
+        external_id=event.get("external_id")
+    )
+    errors = {}
+
+    def account_task(account_id):
+        def collect(worker_session):
+            account_event = {**event, "account_id": account_id, "collected_at": collected_at}
+            try:
+                account_session = pool.session(account_id, caller=worker_session) #AssumeRole은 이 워커의 Session(속도 제한 공유)으로 호출
+                install_rate_limiter(account_event, account_session, budget) #API 한도는 계정별로 적용되므로 토큰 버킷은 계정마다 따로 사용
+                if event.get("regions"):
+                    return handler_multi_region(account_event, account_session)
+                return handler(account_event, account_session)
+            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+                print(f"[WARNING] 계정 수집 실패 ({account_id}): {e}")
+                errors[account_id] = str(e)
+                return None
+        return collect
+
+    per_account = run_tasks(
+        {account_id: account_task(account_id) for account_id in account_ids},
+        session,
+        event.get("account_max_workers", DEFAULT_ACCOUNT_MAX_WORKERS)
+    )
 
-    return result
\ No newline at end of file
+    return {
+        "account_ids": account_ids, #수집 대상 계정 목록
+        "accounts": {account_id: result for account_id, result in per_account.items() if result is not None}, #계정 id -> 해당 계정의 수집 결과
+        "errors": errors, #계정 id -> 수집 실패 사유
+        "collected_at": collected_at #시간
+    }
\ No newline at end of file
@@ -1,9 +1,21 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import base64
 
+#user data 조회를 생략할 수 있는 인스턴스 상태 (skip_inactive 옵션 사용 시)
+INACTIVE_STATES = {"stopping", "stopped", "shutting-down", "terminated"}
+
+#이전 user data를 재사용할 수 있는 인스턴스 상태
+#user data는 중지된 상태에서만 바뀔 수 있고, 다시 시작하면 LaunchTime이 바뀌므로 실행 중인 인스턴스만 LaunchTime으로 판단 (중지된 인스턴스는 항상 다시 조회)
+REUSABLE_STATES = {"pending", "running"}
+
 #EC2 인스턴스 (user data 포함)
-def collect_ec2(session, region: str) -> Dict[str, Any]:
+#- max_workers가 1보다 크면 페이지를 받아오는 동안 user data 조회/디코딩을 스레드 풀에서 동시에 수행
+#- skip_inactive=True이면 중지/종료된 인스턴스의 user data는 조회하지 않음 (None, UserDataSkipped=True로 표시)
+#- previous(이전 수집 결과의 ec2 raw data)를 넘기면 이전 수집 이후 다시 시작되지 않은 실행 중인 인스턴스는 이전 user data를 재사용
+#  (조회를 생략했던 인스턴스는 재사용하지 않음)
+def collect_ec2(session, region: str, max_workers: int = 1, skip_inactive: bool = False, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     #API 호출용 객체 생성
     ec2 = session.client("ec2", region_name=region)
     paginator = ec2.get_paginator("describe_instances")
@@ -11,31 +23,74 @@ def collect_ec2(session, region: str) -> Dict[str, Any]:
     #인스턴스가 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
     instances: List[Dict[str, Any]] = []
 
-    #EC2 DescribeInstances API를 paginator로 반복 호출
-    for page in paginator.paginate(): #인스턴스가 많으면 페이지가 넘어가기 때문에 모든 페이지 불러오기
-        for reservation in page["Reservations"]: #내부적으로 묶여서 반환되는 Reservations 단위로 다시 불러와서
-            for instance in reservation["Instances"]: #Instances 배열 안에 인스턴스들을 가져옴
-                
-                instance_id = instance["InstanceId"] #각 인스턴스의 ID를 가져와서
-                
-                print(f"[+] Processing EC2 Instance: {instance_id}")
-                
-                #해당 인스턴스 ID의 인스턴스에서 속성값을 추가로 가져오도록 attribute 호출
-                base64_user_data = ec2.describe_instance_attribute(InstanceId=instance_id, Attribute="userData")
-
-                #없으면 None로
-                user_data = None
-                #UserData라는 키가 존재하고 해당 키의 Value 값이 존재하면
-                if "UserData" in base64_user_data and "Value" in base64_user_data["UserData"]:
-                    #Value 값을 base64 디코딩하여 userdata 변수에 저장
-                    user_data = base64.b64decode(base64_user_data["UserData"]["Value"]).decode("utf-8")
-
-                instance["UserData"] = user_data #해당 instance 리스트에 UserData 값을 실제 값으로 추가
-
-                instances.append(instance) #위에 정의해둔 구조에 인스턴스 딕셔너리를 하나씩 넣음
+    #이전 수집 결과의 인스턴스를 ID 기준으로 찾을 수 있게 정리
+    previous_instances = {
+        prev["InstanceId"]: prev
+        for prev in (previous or {}).get("instances", [])
+    }
+
+    executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    pending = [] #(인스턴스, user data 조회 future) 목록
+
+    try:
+        #EC2 DescribeInstances API를 paginator로 반복 호출
+        for page in paginator.paginate(): #인스턴스가 많으면 페이지가 넘어가기 때문에 모든 페이지 불러오기
+            for reservation in page["Reservations"]: #내부적으로 묶여서 반환되는 Reservations 단위로 다시 불러와서
+                for instance in reservation["Instances"]: #Instances 배열 안에 인스턴스들을 가져옴
+                    
+                    instance_id = instance["InstanceId"] #각 인스턴스의 ID를 가져와서
+                    
+                    print(f"[+] Processing EC2 Instance: {instance_id}")
+
+                    prev = previous_instances.get(instance_id)
+                    if skip_inactive and instance.get("State", {}).get("Name") in INACTIVE_STATES: #중지/종료된 인스턴스는 user data 생략
+                        instance["UserData"] = None
+                        instance["UserDataSkipped"] = True
+                    elif _reusable(prev, instance): #이전 수집 이후 바뀌지 않았다면 재사용
+                        instance["UserData"] = prev.get("UserData")
+                    elif executor: #동시 조회 모드라면 풀에 맡겨두고 다음 인스턴스로 진행
+                        pending.append((instance, executor.submit(_fetch_user_data, ec2, instance_id)))
+                    else:
+                        instance["UserData"] = _fetch_user_data(ec2, instance_id) #해당 instance 리스트에 UserData 값을 실제 값으로 추가
+
+                    instances.append(instance) #위에 정의해둔 구조에 인스턴스 딕셔너리를 하나씩 넣음
+
+        #풀에 맡겨둔 user data 조회 결과를 각 인스턴스에 채움
+        for instance, future in pending:
+            instance["UserData"] = future.result()
+    finally:
+        if executor:
+            executor.shutdown()
 
     return {
         "region": region, #리전
         "count": len(instances), #인스턴스 개수
         "instances": instances #인스턴스 리스트
-    }
\ No newline at end of file
+    }
+
+#인스턴스 한 개의 user data를 조회하여 base64 디코딩한 값을 반환
+def _fetch_user_data(ec2, instance_id: str) -> Optional[str]:
+    #해당 인스턴스 ID의 인스턴스에서 속성값을 추가로 가져오도록 attribute 호출
+    base64_user_data = ec2.describe_instance_attribute(InstanceId=instance_id, Attribute="userData")
+
+    #없으면 None로
+    user_data = None
+    #UserData라는 키가 존재하고 해당 키의 Value 값이 존재하면
+    if "UserData" in base64_user_data and "Value" in base64_user_data["UserData"]:
+        #Value 값을 base64 디코딩하여 userdata 변수에 저장
+        user_data = base64.b64decode(base64_user_data["UserData"]["Value"]).decode("utf-8")
+    return user_data
+
+#user data 재사용 여부를 판단하기 위한 값
+def _fingerprint(instance: Dict[str, Any]) -> tuple:
+    return (str(instance.get("LaunchTime")), instance.get("State", {}).get("Name"))
+
+#이전 수집 결과의 user data를 재사용할 수 있는지
+#- 이전 수집에서 조회를 생략한 인스턴스(UserDataSkipped)는 재사용하지 않음
+#- 중지된 인스턴스는 LaunchTime이 그대로여도 user data가 바뀌었을 수 있으므로 재사용하지 않음
+def _reusable(prev: Optional[Dict[str, Any]], instance: Dict[str, Any]) -> bool:
+    if prev is None or prev.get("UserDataSkipped"):
+        return False
+    if instance.get("State", {}).get("Name") not in REUSABLE_STATES:
+        return False
+    return _fingerprint(prev) == _fingerprint(instance)
\ No newline at end of file
@@ -0,0 +1,200 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+import csv
+import io
+import time
+import botocore
+
+from collectors.iam_user_collectors import EXCLUDED_USERS
+from collectors.iam_role_collectors import EXCLUDED_ROLES
+
+#GetAccountAuthorizationDetails 응답에만 존재하는 필드 (ListUsers/ListRoles 응답 형태로 맞추기 위해 제거)
+USER_DETAIL_ONLY_FIELDS = {"UserPolicyList", "GroupList", "AttachedManagedPolicies"}
+GROUP_DETAIL_ONLY_FIELDS = {"GroupPolicyList", "AttachedManagedPolicies"}
+ROLE_DETAIL_ONLY_FIELDS = {"RolePolicyList", "AttachedManagedPolicies", "InstanceProfileList"}
+
+#자격 증명 보고서 생성 대기 (GenerateCredentialReport 재호출 간격(초), 최대 재호출 횟수)
+CREDENTIAL_REPORT_POLL_INTERVAL = 1.0
+CREDENTIAL_REPORT_MAX_POLLS = 10
+#자격 증명 보고서를 믿을 수 있는 최대 경과 시간 (초, GeneratedTime 기준)
+CREDENTIAL_REPORT_MAX_AGE = 300
+
+#IAM User/Group/Role/관리형 정책을 GetAccountAuthorizationDetails 한 번(페이지 단위)으로 수집한 뒤
+#collect_iam_user, collect_iam_role과 동일한 users, roles 구조로 변환
+#default_only=True이면 관리형 정책의 Default 버전 문서만 남기고 나머지 버전은 메타데이터만 유지
+def collect_iam_bulk(session, default_only: bool = False) -> Dict[str, Any]:
+    #API 호출용 객체 생성
+    iam = session.client("iam")
+    paginator = iam.get_paginator("get_account_authorization_details")
+
+    user_details: List[Dict[str, Any]] = []
+    group_details: Dict[str, Dict[str, Any]] = {} #GroupName -> Group 상세
+    role_details: List[Dict[str, Any]] = []
+    policy_details: Dict[str, Dict[str, Any]] = {} #PolicyArn -> 관리형 정책 상세 (모든 버전의 Document 포함)
+
+    #페이지마다 User, Group, Role, 정책 목록이 섞여서 반환되므로 모두 모아둠
+    for page in paginator.paginate(Filter=["User", "Group", "Role", "LocalManagedPolicy", "AWSManagedPolicy"]):
+        user_details.extend(page.get("UserDetailList", []))
+        for group in page.get("GroupDetailList", []):
+            group_details[group["GroupName"]] = group
+        role_details.extend(page.get("RoleDetailList", []))
+        for policy in page.get("Policies", []):
+            policy_details[policy["Arn"]] = policy
+
+    #MFA 기기, Access Key 유무는 자격 증명 보고서 한 번으로 확인 (없으면 User별로 조회)
+    credential_report = _credential_report(iam)
+
+    users: List[Dict[str, Any]] = []
+    for detail in user_details:
+        username = detail["UserName"]
+
+        #제외 대상 User는 제외
+        if username in EXCLUDED_USERS:
+            print(f"[!] Skip user: {username}")
+            continue
+
+        print(f"[+] Processing User: {username}")
+
+        user = {k: v for k, v in detail.items() if k not in USER_DETAIL_ONLY_FIELDS}
+        attached_policies = [_attached_policy(p, policy_details, default_only) for p in detail.get("AttachedManagedPolicies", [])]
+        inline_policies = [_inline_policy(p) for p in detail.get("UserPolicyList", [])]
+
+        groups: List[Dict[str, Any]] = []
+        for group_name in detail.get("GroupList", []):
+            group_detail = group_details.get(group_name, {"GroupName": group_name})
+            group = {k: v for k, v in group_detail.items() if k not in GROUP_DETAIL_ONLY_FIELDS}
+
+            #기존 수집기와 동일하게 그룹의 관리형 정책은 User의 관리형 정책 목록에 포함
+            attached_policies.extend(_attached_policy(p, policy_details, default_only) for p in group_detail.get("AttachedManagedPolicies", []))
+
+            group["AttachedPolicies"] = []
+            group["InlinePolicies"] = [_inline_policy(p) for p in group_detail.get("GroupPolicyList", [])]
+            groups.append(group)
+
+        #MFA 기기, Access Key는 GetAccountAuthorizationDetails에 포함되지 않음
+        #자격 증명 보고서에 MFA 기기나 Access Key가 없다고 나온 User는 조회하지 않고, 있거나 보고서에서 믿을 수 없는 User만 User별로 조회
+        #(보고서에는 기기 일련번호, Access Key ID가 없으므로 수집 결과 형식은 ListMFADevices, ListAccessKeys 응답 그대로 유지)
+        row = credential_report.get(username) if credential_report is not None else None
+        if row is None or row.get("mfa_active") == "true":
+            mfa_devices = iam.list_mfa_devices(UserName=username).get("MFADevices", [])
+        else:
+            mfa_devices = []
+        if row is None or _has_access_key(row):
+            access_keys = iam.list_access_keys(UserName=username).get("AccessKeyMetadata", [])
+        else:
+            access_keys = []
+
+        user["Tags"] = detail.get("Tags", [])
+        user["MFADevices"] = mfa_devices
+        user["AccessKeys"] = access_keys
+        user["AttachedPolicies"] = attached_policies
+        user["InlinePolicies"] = inline_policies
+        user["Groups"] = groups
+
+        users.append(user)
+
+    roles: List[Dict[str, Any]] = []
+    for detail in role_details:
+        role_name = detail["RoleName"]
+
+        #제외 대상 Role은 제외
+        if role_name in EXCLUDED_ROLES:
+            print(f"[!] Skip role: {role_name}")
+            continue
+
+        print(f"[+] Processing role: {role_name}")
+
+        role = {k: v for k, v in detail.items() if k not in ROLE_DETAIL_ONLY_FIELDS}
+        role["AttachedPolicies"] = [_attached_policy(p, policy_details, default_only) for p in detail.get("AttachedManagedPolicies", [])]
+        role["InlinePolicies"] = [_inline_policy(p) for p in detail.get("RolePolicyList", [])]
+        role["AssumeRolePolicyDocument"] = detail.get("AssumeRolePolicyDocument")
+        role["Tags"] = detail.get("Tags", [])
+
+        roles.append(role)
+
+    return {
+        "iam_user": {
+            "count": len(users), #User 수
+            "users": users #User 리스트
+        },
+        "iam_role": {
+            "count": len(roles), #역할 수
+            "roles": roles #역할 리스트
+        }
+    }
+
+#자격 증명 보고서(CSV)의 User 이름 -> 행 (보고서를 만들 수 없거나 권한이 없거나 오래되었으면 None)
+#IAM은 4시간 이내에 생성한 보고서가 있으면 새로 만들지 않고 그 보고서를 반환하므로, 보고서 생성 이후에 등록된 MFA 기기나 Access Key는 보고서에 없음
+#- 보고서가 생성된 지 CREDENTIAL_REPORT_MAX_AGE초가 넘었으면 사용하지 않음 (모든 User를 User별로 조회)
+#- 보고서 생성 이후에 만들어진 User(같은 이름으로 다시 만든 User 포함)의 행은 제외 (해당 User는 User별로 조회)
+#그래도 생성 후 CREDENTIAL_REPORT_MAX_AGE초 안에 등록된 MFA 기기, Access Key는 누락될 수 있음
+def _credential_report(iam) -> Optional[Dict[str, Dict[str, str]]]:
+    try:
+        for _ in range(CREDENTIAL_REPORT_MAX_POLLS):
+            if iam.generate_credential_report().get("State") == "COMPLETE":
+                break
+            time.sleep(CREDENTIAL_REPORT_POLL_INTERVAL)
+        else:
+            print("[!] Credential report not ready, listing MFA devices and access keys per user")
+            return None
+        report = iam.get_credential_report()
+    except botocore.exceptions.ClientError as e: #보고서를 사용할 수 없으면 User별 조회
+        print(f"[!] Credential report unavailable ({e}), listing MFA devices and access keys per user")
+        return None
+
+    generated_time = _parse_time(report.get("GeneratedTime"))
+    if generated_time is None or (datetime.now(timezone.utc) - generated_time).total_seconds() > CREDENTIAL_REPORT_MAX_AGE:
+        print(f"[!] Credential report generated at {report.get('GeneratedTime')} is stale, listing MFA devices and access keys per user")
+        return None
+
+    content = report.get("Content", b"")
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    rows = {}
+    for row in csv.DictReader(io.StringIO(content)):
+        created = _parse_time(row.get("user_creation_time"))
+        if row.get("user") and created is not None and created < generated_time:
+            rows[row["user"]] = row
+    return rows
+
+#보고서의 시각 (boto3 datetime 또는 ISO 문자열, 시간대가 없으면 UTC로 간주, 해석할 수 없으면 None)
+def _parse_time(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+#자격 증명 보고서 행에 Access Key가 하나라도 있는지 (활성/비활성 모두, 없으면 last_rotated가 N/A)
+def _has_access_key(row: Dict[str, str]) -> bool:
+    return any(
+        row.get(f"access_key_{i}_active") == "true" or row.get(f"access_key_{i}_last_rotated", "N/A") not in ("N/A", "")
+        for i in (1, 2)
+    )
+
+#연결된 관리형 정책({PolicyName, PolicyArn})에 수집해둔 버전 목록과 Default 버전을 채워서 반환
+def _attached_policy(attached: Dict[str, Any], policy_details: Dict[str, Dict[str, Any]], default_only: bool = False) -> Dict[str, Any]:
+    policy = dict(attached)
+    detail = policy_details.get(policy["PolicyArn"], {})
+
+    policy["Versions"] = [
+        {
+            "VersionId": v["VersionId"],
+            "IsDefaultVersion": v["IsDefaultVersion"],
+            "Document": v.get("Document") if v["IsDefaultVersion"] or not default_only else None
+        }
+        for v in detail.get("PolicyVersionList", [])
+    ]
+    policy["DefaultVersionId"] = detail.get("DefaultVersionId")
+    return policy
+
+#인라인 정책을 기존 수집기와 같은 {PolicyName, PolicyDocument} 형태로 변환
+def _inline_policy(inline: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "PolicyName": inline["PolicyName"], #정책 이름
+        "PolicyDocument": inline["PolicyDocument"] #정책 내용
+    }
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from typing import Any, Dict, List
 
+from collectors.policy_cache import ManagedPolicyCache
+
 #제외할 Role 목록
 EXCLUDED_ROLES = {
     "AWSServiceRoleForAmazonEventBridgeApiDestinations",
@@ -19,9 +21,11 @@ EXCLUDED_ROLES = {
 }
 
 #IAM Role과 각 Role에 연결된 인라인, 관리형 정책 + 어떤 주체가 해당 Role을 Assume 할 수 있는지
-def collect_iam_role(session) -> Dict[str, Any]:
+#policy_cache를 넘기면 다른 수집기(User 등)와 관리형 정책 문서 캐시를 공유
+def collect_iam_role(session, policy_cache: ManagedPolicyCache = None) -> Dict[str, Any]:
     #API 호출용 객체 생성
     iam = session.client("iam")
+    policy_cache = policy_cache or ManagedPolicyCache()
     paginator = iam.get_paginator("list_roles")
     
     #Role이 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
@@ -44,28 +48,8 @@ def collect_iam_role(session) -> Dict[str, Any]:
             attached_paginator = iam.get_paginator("list_attached_role_policies") #호출 객체 생성
             for attached_page in attached_paginator.paginate(RoleName=role_name):
                 for policy in attached_page["AttachedPolicies"]: #Role에 연결된 정책을 하나씩 추가
-                    versions = [] #버전 목록 저장용
-                    version_list = iam.list_policy_versions(PolicyArn=policy["PolicyArn"])["Versions"] #해당 정책의 버전 목록을 가져옴
-                    default_version_id = None 
-                    for v in version_list: #버전의 ID와 Default 여부를 표시
-                        versions.append({
-                            "VersionId": v["VersionId"],
-                            "IsDefaultVersion": v["IsDefaultVersion"],
-                            "Document": None 
-                        })
-                        if v["IsDefaultVersion"]: #만약 Default가 true라면
-                            default_version_id = v["VersionId"] #해당 버전을 일단 변수에 저장해두고,
-
-                    for v in versions: #각 버전의 정책 세부 내용 가져오기
-                        version_detail = iam.get_policy_version(
-                            PolicyArn=policy["PolicyArn"],
-                            VersionId=v["VersionId"]
-                        )
-                        v["Document"] = version_detail["PolicyVersion"]["Document"]
-
-                    #버전 목록(각 버전의 id와 default 여부, 정책 내용)을 저장
-                    policy["Versions"] = versions
-                    policy["DefaultVersionId"] = default_version_id #default 버전을 따로 명시
+                    #버전 목록(각 버전의 id와 default 여부, 정책 내용)과 default 버전을 저장 (같은 정책은 캐시에서 재사용)
+                    policy_cache.collect(iam, policy)
                     attached_policies.append(policy)
 
             inline_policies: List[str] = [] #저장될 구조
@@ -1,5 +1,8 @@
 from __future__ import annotations
 from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from collectors.policy_cache import ManagedPolicyCache
 
 #제외할 User 목록
 EXCLUDED_USERS = {
@@ -16,13 +19,16 @@ EXCLUDED_USERS = {
 }
 
 #IAM User와 각 User에 연결된 인라인, 관리형 정책 + 그룹과 그 그룹에 연결된 인라인, 관리형 정책 수집
-def collect_iam_user(session) -> Dict[str, Any]:
+#max_workers가 1보다 크면 User별 상세 조회(정책, 그룹, 태그, MFA, Access Key)를 스레드 풀에서 동시에 수행
+#policy_cache를 넘기면 다른 수집기(Role 등)와 관리형 정책 문서 캐시를 공유
+def collect_iam_user(session, max_workers: int = 1, policy_cache: ManagedPolicyCache = None) -> Dict[str, Any]:
     #API 호출용 객체 생성
     iam = session.client("iam")
+    policy_cache = policy_cache or ManagedPolicyCache()
     paginator = iam.get_paginator("list_users")
     
-    #User가 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
-    users: List[Dict[str, Any]] = []
+    #상세 조회 대상 User 목록 (ListUsers 응답 순서 그대로 유지)
+    targets: List[Dict[str, Any]] = []
 
     #IAM ListUser API를 paginator로 반복 호출
     for page in paginator.paginate(): #User가 많으면 페이지가 넘어가기 때문에 모든 페이지 불러오기
@@ -33,123 +39,96 @@ def collect_iam_user(session) -> Dict[str, Any]:
             if username in EXCLUDED_USERS:
                 print(f"[!] Skip user: {username}")
                 continue
+
+            targets.append(user)
+
+    #User가 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
+    users: List[Dict[str, Any]]
+    if max_workers > 1 and len(targets) > 1: #동시 조회 모드 (client는 스레드 간 공유 가능, map은 입력 순서대로 결과를 반환하므로 순서가 유지됨)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            users = list(executor.map(lambda user: _collect_user_detail(iam, user, policy_cache), targets))
+    else:
+        users = [_collect_user_detail(iam, user, policy_cache) for user in targets]
+
+    return {
+        "count": len(users), #User 수
+        "users": users #User 리스트
+    }
+
+#User 한 명의 관리형/인라인 정책, 그룹, 태그, MFA, Access Key를 조회하여 user 딕셔너리에 추가
+def _collect_user_detail(iam, user: Dict[str, Any], policy_cache: ManagedPolicyCache) -> Dict[str, Any]:
+    username = user["UserName"]
+    print(f"[+] Processing User: {username}")
+    
+    #관리형 정책
+    attached_policies: List[Dict[str, Any]] = [] #저장될 구조
+    attached_paginator = iam.get_paginator("list_attached_user_policies") #호출 객체 생성
+    for attached_page in attached_paginator.paginate(UserName=username):
+        for policy in attached_page["AttachedPolicies"]: #User에게 연결된 정책을 하나씩 추가
+            #버전 목록(각 버전의 id와 default 여부, 정책 내용)과 default 버전을 저장 (같은 정책은 캐시에서 재사용)
+            policy_cache.collect(iam, policy)
+            attached_policies.append(policy)
+
+    #인라인 정책
+    inline_policies: List[str] = [] #저장될 구조
+    inline_paginator = iam.get_paginator("list_user_policies") #호출 객체 생성
+    for inline_page in inline_paginator.paginate(UserName=username):
+        for policy_name in inline_page["PolicyNames"]: #연결된 인라인 정책의 내용을 불러옴
+            policy_detail = iam.get_user_policy(UserName=username, PolicyName=policy_name)
+            inline_policies.append({
+                "PolicyName": policy_name, #정책 이름
+                "PolicyDocument": policy_detail["PolicyDocument"] #정책 내용 
+            })
             
-            print(f"[+] Processing User: {username}")
-            
-            #관리형 정책
-            attached_policies: List[Dict[str, Any]] = [] #저장될 구조
-            attached_paginator = iam.get_paginator("list_attached_user_policies") #호출 객체 생성
-            for attached_page in attached_paginator.paginate(UserName=username):
-                for policy in attached_page["AttachedPolicies"]: #User에게 연결된 정책을 하나씩 추가
-                    versions = [] #버전 목록 저장용
-                    version_list = iam.list_policy_versions(PolicyArn=policy["PolicyArn"])["Versions"] #해당 정책의 버전 목록을 가져옴
-                    default_version_id = None 
-                    for v in version_list: #버전의 ID와 Default 여부를 표시
-                        versions.append({
-                            "VersionId": v["VersionId"],
-                            "IsDefaultVersion": v["IsDefaultVersion"],
-                            "Document": None 
-                        })
-                        if v["IsDefaultVersion"]: #만약 Default가 true라면
-                            default_version_id = v["VersionId"] #해당 버전을 일단 변수에 저장해두고,
-
-                    for v in versions: #각 버전의 정책 세부 내용 가져오기
-                        version_detail = iam.get_policy_version(
-                            PolicyArn=policy["PolicyArn"],
-                            VersionId=v["VersionId"]
-                        )
-                        v["Document"] = version_detail["PolicyVersion"]["Document"]
-
-                    #버전 목록(각 버전의 id와 default 여부, 정책 내용)을 저장
-                    policy["Versions"] = versions
-                    policy["DefaultVersionId"] = default_version_id #default 버전을 따로 명시
+    #그룹
+    groups: List[Dict[str, Any]] = []
+    group_paginator = iam.get_paginator("list_groups_for_user") #호출 객체 생성
+    for group_page in group_paginator.paginate(UserName=username): #User에게 연결된 그룹을 하나씩 가져옴
+        for group in group_page["Groups"]: #Groups 배열 안에 그룹 들을 하나씩 불러와서
+            group_name = group["GroupName"] #그룹의 정책 조회에 사용될 Group Name을 불러옴
+
+            #그룹 - 관리형 정책
+            group_attached: List[Dict[str, Any]] = [] #저장될 구조
+            attached_group_paginator = iam.get_paginator("list_attached_group_policies") #호출 객체 생성
+            for g_attached_page in attached_group_paginator.paginate(GroupName=group_name):
+                for policy in g_attached_page["AttachedPolicies"]: #Group에 연결된 정책을 하나씩 추가
+                    #버전 목록(각 버전의 id와 default 여부, 정책 내용)과 default 버전을 저장 (같은 정책은 캐시에서 재사용)
+                    policy_cache.collect(iam, policy)
                     attached_policies.append(policy)
 
-            #인라인 정책
-            inline_policies: List[str] = [] #저장될 구조
-            inline_paginator = iam.get_paginator("list_user_policies") #호출 객체 생성
-            for inline_page in inline_paginator.paginate(UserName=username):
-                for policy_name in inline_page["PolicyNames"]: #연결된 인라인 정책의 내용을 불러옴
-                    policy_detail = iam.get_user_policy(UserName=username, PolicyName=policy_name)
-                    inline_policies.append({
+            #그룹 - 인라인 정책
+            group_inline: List[str] = [] #저장될 구조
+            inline_group_paginator = iam.get_paginator("list_group_policies") #호출 객체 생성
+            for g_inline_page in inline_group_paginator.paginate(GroupName=group_name):
+                for policy_name in g_inline_page["PolicyNames"]: #연결된 인라인 정책의 내용을 불러옴
+                    policy_detail = iam.get_group_policy(GroupName=group_name, PolicyName=policy_name)
+                    group_inline.append({
                         "PolicyName": policy_name, #정책 이름
                         "PolicyDocument": policy_detail["PolicyDocument"] #정책 내용 
                     })
                     
-            #그룹
-            groups: List[Dict[str, Any]] = []
-            group_paginator = iam.get_paginator("list_groups_for_user") #호출 객체 생성
-            for group_page in group_paginator.paginate(UserName=username): #User에게 연결된 그룹을 하나씩 가져옴
-                for group in group_page["Groups"]: #Groups 배열 안에 그룹 들을 하나씩 불러와서
-                    group_name = group["GroupName"] #그룹의 정책 조회에 사용될 Group Name을 불러옴
-
-                    #그룹 - 관리형 정책
-                    group_attached: List[Dict[str, Any]] = [] #저장될 구조
-                    attached_group_paginator = iam.get_paginator("list_attached_group_policies") #호출 객체 생성
-                    for g_attached_page in attached_group_paginator.paginate(GroupName=group_name):
-                        for policy in g_attached_page["AttachedPolicies"]: #Group에 연결된 정책을 하나씩 추가
-                            versions = [] #버전 목록 저장용
-                            version_list = iam.list_policy_versions(PolicyArn=policy["PolicyArn"])["Versions"] #해당 정책의 버전 목록을 가져옴
-                            default_version_id = None 
-                            for v in version_list: #버전의 ID와 Default 여부를 표시
-                                versions.append({
-                                    "VersionId": v["VersionId"],
-                                    "IsDefaultVersion": v["IsDefaultVersion"],
-                                    "Document": None 
-                                })
-                                if v["IsDefaultVersion"]: #만약 Default가 true라면
-                                    default_version_id = v["VersionId"] #해당 버전을 일단 변수에 저장해두고,
-
-                            for v in versions: #각 버전의 정책 세부 내용 가져오기
-                                version_detail = iam.get_policy_version(
-                                    PolicyArn=policy["PolicyArn"],
-                                    VersionId=v["VersionId"]
-                                )
-                                v["Document"] = version_detail["PolicyVersion"]["Document"]
-
-                            #버전 목록(각 버전의 id와 default 여부, 정책 내용)을 저장
-                            policy["Versions"] = versions
-                            policy["DefaultVersionId"] = default_version_id #default 버전을 따로 명시
-                            attached_policies.append(policy)
-
-                    #그룹 - 인라인 정책
-                    group_inline: List[str] = [] #저장될 구조
-                    inline_group_paginator = iam.get_paginator("list_group_policies") #호출 객체 생성
-                    for g_inline_page in inline_group_paginator.paginate(GroupName=group_name):
-                        for policy_name in g_inline_page["PolicyNames"]: #연결된 인라인 정책의 내용을 불러옴
-                            policy_detail = iam.get_group_policy(GroupName=group_name, PolicyName=policy_name)
-                            group_inline.append({
-                                "PolicyName": policy_name, #정책 이름
-                                "PolicyDocument": policy_detail["PolicyDocument"] #정책 내용 
-                            })
-                            
-                    #그룹에 연결된 정책을 그룹 딕셔너리에 추가
-                    group["AttachedPolicies"] = group_attached
-                    group["InlinePolicies"] = group_inline
-                    groups.append(group) 
-
-            #--- (수정) 추가 수집 ---
-
-            #User 태그 목록 수집
-            user_tag = iam.list_user_tags(UserName=username)
-
-            #MFA 기기 상태 수집
-            mfa_device = iam.list_mfa_devices(UserName=username)
-
-            #Access Key 목록 수집
-            access_key = iam.list_access_keys(UserName=username)
-                    
-            #수집된 모든 데이터를 User 객체에 통합 저장
-            user["Tags"] = user_tag.get("Tags", [])
-            user["MFADevices"] = mfa_device.get("MFADevices", [])
-            user["AccessKeys"] = access_key.get("AccessKeyMetadata", [])
-            user["AttachedPolicies"] = attached_policies
-            user["InlinePolicies"] = inline_policies
-            user["Groups"] = groups
+            #그룹에 연결된 정책을 그룹 딕셔너리에 추가
+            group["AttachedPolicies"] = group_attached
+            group["InlinePolicies"] = group_inline
+            groups.append(group) 
 
-            users.append(user)
+    #--- (수정) 추가 수집 ---
 
-    return {
-        "count": len(users), #User 수
-        "users": users #User 리스트
-    }
\ No newline at end of file
+    #User 태그 목록 수집
+    user_tag = iam.list_user_tags(UserName=username)
+
+    #MFA 기기 상태 수집
+    mfa_device = iam.list_mfa_devices(UserName=username)
+
+    #Access Key 목록 수집
+    access_key = iam.list_access_keys(UserName=username)
+            
+    #수집된 모든 데이터를 User 객체에 통합 저장
+    user["Tags"] = user_tag.get("Tags", [])
+    user["MFADevices"] = mfa_device.get("MFADevices", [])
+    user["AccessKeys"] = access_key.get("AccessKeyMetadata", [])
+    user["AttachedPolicies"] = attached_policies
+    user["InlinePolicies"] = inline_policies
+    user["Groups"] = groups
+
+    return user
\ No newline at end of file
@@ -1,9 +1,10 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import botocore
 
 #Lambda 함수
-def collect_lambda(session, region: str) -> Dict[str, Any]:
+#previous(이전 수집 결과의 lambda raw data)를 넘기면 LastModified와 RevisionId가 그대로인 함수는 이전 리소스 기반 정책을 재사용
+def collect_lambda(session, region: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     #API 호출용 객체 생성
     lambda_client = session.client("lambda", region_name=region)
     paginator = lambda_client.get_paginator("list_functions")
@@ -11,23 +12,34 @@ def collect_lambda(session, region: str) -> Dict[str, Any]:
     #함수가 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
     functions: List[Dict[str, Any]] = []
 
+    #이전 수집 결과의 함수를 이름 기준으로 찾을 수 있게 정리
+    previous_functions = {
+        prev["FunctionName"]: prev
+        for prev in (previous or {}).get("functions", [])
+    }
+
     #Lambda ListFunction API를 paginator로 반복 호출
     for page in paginator.paginate(): #함수가 많으면 페이지가 넘어가기 때문에 모든 페이지 불러오기
         for function in page["Functions"]: #Functions 배열 안에 함수들을 가져옴
             function_name = function["FunctionName"]
             print(f"[+] Processing Lambda Function: {function_name}")
                 
-            #함수의 리소스 기반 정책 가져오기
-            try:
-                policy = lambda_client.get_policy(FunctionName=function_name)
-                function["ResourceBasedPolicy"] = policy.get("Policy", {})
-                
-            except botocore.exceptions.ClientError as e: #없을 경우 예외처리
-                code = e.response.get("Error", {}).get("Code")
-                if code in ("ResourceNotFoundException", "ResourceNotFound"):
-                    policy = None
-                else:
-                    policy = {"__error__": str(e)}
+            prev = previous_functions.get(function_name)
+            if prev is not None and _fingerprint(prev) == _fingerprint(function): #정책이 바뀌면 RevisionId도 바뀌므로 그대로면 재사용
+                if "ResourceBasedPolicy" in prev:
+                    function["ResourceBasedPolicy"] = prev["ResourceBasedPolicy"]
+            else:
+                #함수의 리소스 기반 정책 가져오기
+                try:
+                    policy = lambda_client.get_policy(FunctionName=function_name)
+                    function["ResourceBasedPolicy"] = policy.get("Policy", {})
+                    
+                except botocore.exceptions.ClientError as e: #없을 경우 예외처리
+                    code = e.response.get("Error", {}).get("Code")
+                    if code in ("ResourceNotFoundException", "ResourceNotFound"):
+                        policy = None
+                    else:
+                        policy = {"__error__": str(e)}
                     
             #이벤트 소스 매핑 (SQS 등 연결된 이벤트가 있는지)
             esm_paginator = lambda_client.get_paginator("list_event_source_mappings")
@@ -46,3 +58,7 @@ def collect_lambda(session, region: str) -> Dict[str, Any]:
         "count": len(functions), #함수 개수
         "functions": functions #함수 리스트
     }
+
+#리소스 기반 정책 재사용 여부를 판단하기 위한 값 (함수 설정이나 정책이 바뀌면 RevisionId가 바뀜)
+def _fingerprint(function: Dict[str, Any]) -> tuple:
+    return (function.get("LastModified"), function.get("RevisionId"))
\ No newline at end of file
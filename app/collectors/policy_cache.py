@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import threading
+
+#관리형 정책 문서 캐시
+#- 같은 관리형 정책이 여러 User/Group/Role에 연결되어 있어도 버전 목록과 문서는 한 번만 조회
+#- 메모리 캐시는 한 번의 수집(run) 동안 PolicyArn, (PolicyArn, VersionId) 기준으로 유지
+#- cache_dir을 지정하면 (PolicyArn, VersionId, UpdateDate) 기준으로 디스크에도 저장하여 다음 호출에서 재사용
+#- default_only=True이면 Default 버전의 문서만 조회하고 나머지 버전은 메타데이터(Document=None)만 채움
+class ManagedPolicyCache:
+    def __init__(self, cache_dir: Optional[str] = None, default_only: bool = False):
+        self.cache_dir = cache_dir
+        self.default_only = default_only
+        self._versions: Dict[str, List[Dict[str, Any]]] = {} #PolicyArn -> 버전 목록 (VersionId, IsDefaultVersion)
+        self._documents: Dict[tuple, Any] = {} #(PolicyArn, VersionId) -> 정책 문서
+        self._lock = threading.Lock()
+        self._policy_locks: Dict[str, threading.Lock] = {} #PolicyArn별 lock (동시에 같은 정책을 중복 조회하지 않도록)
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    #연결된 관리형 정책 딕셔너리에 Versions(각 버전의 id와 default 여부, 정책 내용)와 DefaultVersionId를 채워서 반환
+    def collect(self, iam, policy: Dict[str, Any]) -> Dict[str, Any]:
+        policy_arn = policy["PolicyArn"]
+
+        with self._policy_lock(policy_arn):
+            if policy_arn not in self._versions: #이번 수집에서 처음 보는 정책이면 API로 조회
+                self._versions[policy_arn] = self._fetch_versions(iam, policy_arn)
+
+        #캐시된 값을 그대로 공유하지 않도록 버전 딕셔너리는 복사해서 넣음 (Document는 읽기 전용으로 공유)
+        versions = [dict(v) for v in self._versions[policy_arn]]
+        policy["Versions"] = versions
+        policy["DefaultVersionId"] = next((v["VersionId"] for v in versions if v["IsDefaultVersion"]), None) #default 버전을 따로 명시
+        return policy
+
+    def _policy_lock(self, policy_arn: str) -> threading.Lock:
+        with self._lock:
+            return self._policy_locks.setdefault(policy_arn, threading.Lock())
+
+    def _fetch_versions(self, iam, policy_arn: str) -> List[Dict[str, Any]]:
+        version_list = iam.list_policy_versions(PolicyArn=policy_arn)["Versions"] #해당 정책의 버전 목록을 가져옴
+
+        #디스크 캐시를 쓰는 경우 정책의 UpdateDate를 함께 키로 사용 (정책이 갱신되면 다른 키가 되어 새로 조회)
+        update_date = None
+        if self.cache_dir:
+            update_date = str(iam.get_policy(PolicyArn=policy_arn)["Policy"].get("UpdateDate"))
+
+        versions = []
+        for v in version_list: #버전의 ID와 Default 여부를 표시하고 각 버전의 정책 세부 내용 가져오기
+            document = None
+            if v["IsDefaultVersion"] or not self.default_only: #default_only 모드라면 Default 버전의 문서만 가져옴
+                document = self._document(iam, policy_arn, v["VersionId"], update_date)
+            versions.append({
+                "VersionId": v["VersionId"],
+                "IsDefaultVersion": v["IsDefaultVersion"],
+                "Document": document
+            })
+        return versions
+
+    def _document(self, iam, policy_arn: str, version_id: str, update_date: Optional[str]) -> Any:
+        key = (policy_arn, version_id)
+        if key in self._documents:
+            return self._documents[key]
+
+        document = self._load(policy_arn, version_id, update_date)
+        if document is None: #디스크에도 없으면 API로 조회 후 저장
+            version_detail = iam.get_policy_version(
+                PolicyArn=policy_arn,
+                VersionId=version_id
+            )
+            document = version_detail["PolicyVersion"]["Document"]
+            self._store(policy_arn, version_id, update_date, document)
+
+        self._documents[key] = document
+        return document
+
+    #디스크 캐시 파일 경로 (ARN, 버전, UpdateDate를 해시하여 파일 이름으로 사용)
+    def _path(self, policy_arn: str, version_id: str, update_date: Optional[str]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(f"{policy_arn}|{version_id}|{update_date}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, policy_arn: str, version_id: str, update_date: Optional[str]) -> Any:
+        path = self._path(policy_arn, version_id, update_date)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError): #깨진 캐시 파일은 무시하고 다시 조회
+            return None
+
+    def _store(self, policy_arn: str, version_id: str, update_date: Optional[str], document: Any) -> None:
+        path = self._path(policy_arn, version_id, update_date)
+        if not path:
+            return
+        tmp_path = f"{path}.{threading.get_ident()}.tmp" #쓰는 도중의 파일을 다른 호출이 읽지 않도록 임시 파일에 쓴 뒤 교체
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e: #디스크 캐시 저장 실패는 수집 결과에 영향이 없으므로 경고만 출력
+            print(f"[WARNING] 정책 캐시 저장 실패 ({policy_arn} {version_id}): {e}")
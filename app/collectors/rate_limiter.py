@@ -0,0 +1,189 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import random
+import threading
+import time
+import weakref
+from botocore.config import Config
+
+#서비스별 기본 초당 요청 수 (서비스 id 기준, 명시되지 않은 서비스는 DEFAULT_RATE 사용)
+#IAM, Lambda 제어 API처럼 TPS 한도가 낮은 서비스는 낮게 잡아둠
+DEFAULT_RATES = {
+    "iam": 10.0,
+    "sts": 20.0,
+    "ec2": 50.0,
+    "lambda": 10.0,
+    "sqs": 50.0,
+    "rds": 20.0,
+    "secrets-manager": 40.0
+}
+DEFAULT_RATE = 20.0
+MIN_RATE = 0.5 #throttling이 계속되어도 이 값 아래로는 내리지 않음
+
+#재시도 설정
+DEFAULT_MAX_ATTEMPTS = 5 #요청 하나당 최대 시도 횟수 (첫 시도 포함)
+DEFAULT_RETRY_BUDGET = 500 #수집 전체에서 재시도에 사용할 수 있는 토큰 수
+RETRY_COST = 5 #재시도 1회에 소모되는 토큰
+TIMEOUT_RETRY_COST = 10 #연결 오류/타임아웃 재시도 1회에 소모되는 토큰
+SUCCESS_REFUND = 1 #요청이 성공할 때마다 돌려받는 토큰
+BASE_DELAY = 0.2 #재시도 대기 시간의 기준 (초)
+MAX_DELAY = 20.0 #재시도 대기 시간 상한 (초)
+
+#throttling으로 판단하는 에러 코드
+THROTTLING_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "SlowDown",
+    "ProvisionedThroughputExceededException",
+    "BandwidthLimitExceeded"
+}
+#throttling은 아니지만 재시도하면 성공할 수 있는 에러 코드
+TRANSIENT_CODES = {"RequestTimeout", "RequestTimeoutException", "PriorRequestNotComplete", "InternalError", "ServiceUnavailable"}
+
+#Session -> 설치된 RateLimiter (worker_session 등에서 새로 만든 Session에도 같은 limiter를 설치하기 위함)
+_installed: "weakref.WeakKeyDictionary[Any, RateLimiter]" = weakref.WeakKeyDictionary()
+
+#서비스 하나의 토큰 버킷
+#- rate개/초 속도로 토큰이 채워지고, 요청마다 토큰 1개를 사용 (토큰이 없으면 채워질 때까지 대기)
+#- throttling 응답을 받으면 속도를 절반으로 줄이고, 성공할 때마다 조금씩 원래 속도로 회복
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, rate) #최대 1초 분량까지 몰아서 보낼 수 있음
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1 #토큰이 부족하면 음수가 되어 뒤에 오는 요청의 대기 시간이 길어짐
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0: #lock 밖에서 대기하여 다른 스레드가 순서대로 예약할 수 있게 함
+            time.sleep(wait)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+
+    def on_success(self) -> None:
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+#수집 전체가 공유하는 재시도 예산
+#- 재시도할 때마다 토큰을 사용하고 성공한 요청마다 조금씩 돌려받음
+#- 예산이 바닥나면 더 이상 재시도하지 않고 에러를 그대로 반환 (장애 상황에서 재시도 폭주 방지)
+class RetryBudget:
+    def __init__(self, capacity: int = DEFAULT_RETRY_BUDGET):
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def spend(self, cost: int) -> bool:
+        with self._lock:
+            if self._tokens < cost:
+                return False
+            self._tokens -= cost
+            return True
+
+    def refund(self, amount: int = SUCCESS_REFUND) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+#서비스별 토큰 버킷 + 재시도 예산
+#install(session)으로 Session에 설치하면 그 Session에서 만들어지는 모든 client의 요청에 적용됨
+#- botocore 기본 재시도는 끄고 needs-retry 이벤트에서 직접 재시도 여부와 대기 시간을 결정
+class RateLimiter:
+    def __init__(self, rates: Optional[Dict[str, float]] = None, budget: Optional[RetryBudget] = None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self.budget = budget or RetryBudget()
+        self.max_attempts = max_attempts
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, service: str) -> TokenBucket:
+        with self._lock:
+            if service not in self._buckets:
+                self._buckets[service] = TokenBucket(self.rates.get(service, DEFAULT_RATE))
+            return self._buckets[service]
+
+    #Session에 설치 (client를 만들기 전에 호출해야 함)
+    def install(self, session) -> None:
+        botocore_session = session._session
+        config = Config(retries={"mode": "standard", "total_max_attempts": 1}) #botocore 자체 재시도는 사용하지 않음
+        default_config = botocore_session.get_default_client_config()
+        botocore_session.set_default_client_config(default_config.merge(config) if default_config else config)
+
+        session.events.register("before-send", self._before_send, unique_id="inventory-rate-limiter-send")
+        session.events.register("needs-retry", self._needs_retry, unique_id="inventory-rate-limiter-retry")
+        _installed[session] = self
+
+    #요청(재시도 포함)을 보내기 직전에 해당 서비스의 토큰을 하나 사용
+    def _before_send(self, event_name: str = "", **kwargs) -> None:
+        self.bucket(_service(event_name)).acquire()
+        return None #None이 아니면 botocore가 응답으로 사용하므로 반드시 None 반환
+
+    #응답을 받은 뒤 재시도 여부 결정 (재시도하면 대기할 초, 아니면 None)
+    def _needs_retry(self, event_name: str = "", response=None, attempts: int = 1, caught_exception=None, **kwargs) -> Optional[float]:
+        bucket = self.bucket(_service(event_name))
+        code = None
+        status = None
+        if response is not None:
+            http_response, parsed = response
+            status = http_response.status_code
+            code = parsed.get("Error", {}).get("Code")
+
+        if caught_exception is None and code is None and status is not None and status < 500: #성공
+            bucket.on_success()
+            self.budget.refund()
+            return None
+
+        if code in THROTTLING_CODES or status == 429:
+            bucket.on_throttle()
+            cost = RETRY_COST
+        elif caught_exception is not None:
+            cost = TIMEOUT_RETRY_COST
+        elif code in TRANSIENT_CODES or (status is not None and status >= 500):
+            cost = RETRY_COST
+        else: #AccessDenied 등 재시도해도 결과가 같은 에러
+            return None
+
+        if attempts >= self.max_attempts or not self.budget.spend(cost):
+            return None
+
+        #지수 백오프 + full jitter
+        return random.uniform(0, min(MAX_DELAY, BASE_DELAY * (2 ** attempts)))
+
+#Session에 설치된 RateLimiter (없으면 None)
+def rate_limiter_for(session) -> Optional[RateLimiter]:
+    return _installed.get(session)
+
+#event 설정에 따라 Session에 RateLimiter 설치 (이미 설치되어 있으면 그대로 사용)
+def install_rate_limiter(event, session, budget: Optional[RetryBudget] = None) -> Optional[RateLimiter]:
+    if not event.get("rate_limit", True):
+        return None
+    limiter = rate_limiter_for(session)
+    if limiter is None:
+        limiter = RateLimiter(
+            event.get("rate_limits"),
+            budget or RetryBudget(event.get("retry_budget", DEFAULT_RETRY_BUDGET)),
+            event.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        )
+        limiter.install(session)
+    return limiter
+
+#이벤트 이름(needs-retry.iam.ListUsers 등)에서 서비스 id 추출
+def _service(event_name: str) -> str:
+    parts = event_name.split(".")
+    return parts[1] if len(parts) > 1 else ""
@@ -1,14 +1,21 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 #Secretsmanager
-def collect_secretsmanager(session, region) -> Dict[str, Any]:
+#previous(이전 수집 결과의 secretsmanager raw data)를 넘기면 LastChangedDate가 그대로인 시크릿은 이전 리소스 정책을 재사용
+def collect_secretsmanager(session, region, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     #API 호출용 객체 생성
     secretsmanager = session.client("secretsmanager", region_name=region)
     paginator = secretsmanager.get_paginator("list_secrets")
     
     # Secret 정보가 저장될 구조 (리스트 안에 딕셔너리가 존재하며, 딕셔너리의 str 키에 어떤 형태로든 값이 들어갈 수 있음)
     secrets: List[Dict[str, Any]] = []
+
+    #이전 수집 결과의 시크릿을 ARN 기준으로 찾을 수 있게 정리
+    previous_secrets = {
+        prev.get("ARN"): prev
+        for prev in (previous or {}).get("secrets", [])
+    }
     
     #Secrets Manager ListSecrets API를 paginator로 반복 호출
     for page in paginator.paginate():
@@ -16,11 +23,15 @@ def collect_secretsmanager(session, region) -> Dict[str, Any]:
             secret_arn = secret.get("ARN")
             print(f"[+] Processing Secret: {secret.get('Name')}")
 
-            #리소스 기반 정책 수집
-            policy_res = secretsmanager.get_resource_policy(SecretId=secret_arn)
-            
-            #최종적으로 리소스 정책 정보 추가
-            secret["ResourcePolicy"] = policy_res.get("ResourcePolicy")
+            prev = previous_secrets.get(secret_arn)
+            if prev is not None and str(prev.get("LastChangedDate")) == str(secret.get("LastChangedDate")): #리소스 정책을 바꾸면 LastChangedDate도 바뀌므로 그대로면 재사용
+                secret["ResourcePolicy"] = prev.get("ResourcePolicy")
+            else:
+                #리소스 기반 정책 수집
+                policy_res = secretsmanager.get_resource_policy(SecretId=secret_arn)
+                
+                #최종적으로 리소스 정책 정보 추가
+                secret["ResourcePolicy"] = policy_res.get("ResourcePolicy")
 
             secrets.append(secret) #최종 저장
             
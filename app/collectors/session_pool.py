@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import threading
+import boto3
+from botocore.credentials import CredentialProvider, CredentialResolver, RefreshableCredentials
+from botocore.session import get_session
+
+#AssumeRole 세션 이름 (CloudTrail에서 수집 작업을 구분하기 위함)
+DEFAULT_SESSION_NAME = "aws-infra-inventory"
+#AssumeRole 자격 증명 유효 시간 (초)
+DEFAULT_DURATION_SECONDS = 3600
+
+#이미 만들어진 자격 증명 객체를 그대로 반환하는 credential provider
+#여러 Session이 같은 자격 증명 객체를 공유하므로 RefreshableCredentials의 갱신이 모든 Session에 반영됨
+class SharedCredentialProvider(CredentialProvider):
+    METHOD = "shared-credentials"
+    CANONICAL_NAME = "SharedCredentials"
+
+    def __init__(self, credentials):
+        super().__init__()
+        self._shared = credentials
+
+    def load(self):
+        return self._shared
+
+#자격 증명 객체를 공유하는 boto3 Session 생성 (botocore의 credential_provider 컴포넌트로 등록)
+def session_with_credentials(credentials, region_name: Optional[str] = None):
+    botocore_session = get_session()
+    botocore_session.register_component("credential_provider", CredentialResolver(providers=[SharedCredentialProvider(credentials)]))
+    return boto3.Session(botocore_session=botocore_session, region_name=region_name)
+
+#여러 계정을 수집하기 위한 AssumeRole 세션 풀
+#- 계정별로 STS AssumeRole 자격 증명을 한 번만 발급받아 캐시하고, 같은 계정의 모든 Session/client가 공유
+#- 자격 증명은 RefreshableCredentials로 관리되어 만료 전에(기본 15분 전) 자동으로 다시 AssumeRole 호출
+#- 여러 스레드에서 동시에 사용해도 같은 계정에 대해 AssumeRole을 중복 호출하지 않음
+class AssumedRoleSessionPool:
+    def __init__(self, session, role_name: str, session_name: str = DEFAULT_SESSION_NAME,
+                 duration_seconds: int = DEFAULT_DURATION_SECONDS, external_id: Optional[str] = None):
+        self.role_name = role_name
+        self.session_name = session_name
+        self.duration_seconds = duration_seconds
+        self.external_id = external_id
+        self.region_name = session.region_name
+        self._sts = session.client("sts") #호출자(관리 계정) 자격 증명으로 AssumeRole 호출
+        self._credentials: Dict[str, RefreshableCredentials] = {} #계정 id -> 자격 증명
+        self._lock = threading.Lock()
+        self._account_locks: Dict[str, threading.Lock] = {} #계정별 lock
+
+    #계정의 Role ARN
+    def role_arn(self, account_id: str) -> str:
+        return f"arn:aws:iam::{account_id}:role/{self.role_name}"
+
+    #계정의 자격 증명 (처음 요청될 때 AssumeRole 호출)
+    #caller: 처음 AssumeRole을 호출할 Session (워커 전용 Session 등, 없으면 풀을 만들 때 받은 Session), 갱신은 풀의 client로 호출
+    def credentials(self, account_id: str, caller=None) -> RefreshableCredentials:
+        with self._account_lock(account_id):
+            if account_id not in self._credentials:
+                self._credentials[account_id] = RefreshableCredentials.create_from_metadata(
+                    metadata=self._assume_role(account_id, caller.client("sts") if caller is not None else None),
+                    refresh_using=lambda: self._assume_role(account_id), #만료가 가까워지면 다시 AssumeRole
+                    method="sts-assume-role"
+                )
+            return self._credentials[account_id]
+
+    #계정의 자격 증명을 사용하는 boto3 Session 생성 (자격 증명 객체를 공유해야 갱신된 값이 모든 Session에 반영됨)
+    def session(self, account_id: str, region_name: Optional[str] = None, caller=None):
+        return session_with_credentials(self.credentials(account_id, caller), region_name or self.region_name)
+
+    def _account_lock(self, account_id: str) -> threading.Lock:
+        with self._lock:
+            return self._account_locks.setdefault(account_id, threading.Lock())
+
+    def _assume_role(self, account_id: str, sts=None) -> Dict[str, Any]:
+        params = {
+            "RoleArn": self.role_arn(account_id),
+            "RoleSessionName": self.session_name,
+            "DurationSeconds": self.duration_seconds
+        }
+        if self.external_id:
+            params["ExternalId"] = self.external_id
+
+        credentials = (sts or self._sts).assume_role(**params)["Credentials"]
+        #RefreshableCredentials가 요구하는 metadata 형식으로 변환
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat()
+        }
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+from datetime import datetime
+import json
+import os
+import threading
+
+#이전 수집 결과(raw data) 스냅샷 저장소
+#- 계정 id, 리전별로 마지막 수집 결과를 JSON 파일로 저장해두고 다음 수집 때 previous로 넘겨서 변경되지 않은 리소스의 상세 조회를 생략
+#- boto3 응답의 datetime 값은 {"__datetime__": ISO 문자열}로 저장했다가 읽을 때 datetime으로 되돌림 (fingerprint 비교, 정규화 결과가 처음 수집할 때와 같도록)
+
+#스냅샷 파일 경로
+def snapshot_path(snapshot_dir: str, account_id: str, region: str) -> str:
+    return os.path.join(snapshot_dir, f"{account_id}_{region}.json")
+
+#스냅샷 읽기 (없거나 깨진 파일이면 None -> 전체 수집)
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f, object_hook=_decode)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] 스냅샷 읽기 실패 ({path}): {e}")
+        return None
+
+#스냅샷 저장 (쓰는 도중의 파일을 다른 호출이 읽지 않도록 임시 파일에 쓴 뒤 교체)
+def save_snapshot(path: str, collected: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(collected, f, ensure_ascii=False, cls=SnapshotEncoder)
+        os.replace(tmp_path, path)
+    except OSError as e: #스냅샷 저장 실패는 수집 결과에 영향이 없으므로 경고만 출력
+        print(f"[WARNING] 스냅샷 저장 실패 ({path}): {e}")
+
+#datetime을 태그가 붙은 딕셔너리로 저장하는 JSON 인코더
+class SnapshotEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime):
+            return {"__datetime__": o.isoformat()}
+        return super().default(o)
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
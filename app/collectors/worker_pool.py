@@ -0,0 +1,35 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+
+from collectors.rate_limiter import rate_limiter_for
+from collectors.session_pool import session_with_credentials
+
+#동시 수집 시 기본 워커 수 (수집 대상 서비스 개수와 동일)
+DEFAULT_MAX_WORKERS = 8
+
+#워커 전용 boto3 Session 생성 (boto3 Session은 스레드 간 공유가 안전하지 않기 때문에 워커마다 새로 만들어서 사용)
+def worker_session(session):
+    credentials = session.get_credentials()
+    if credentials is None: #자격 증명이 없으면 기본 자격 증명 체인에 맡김
+        new_session = boto3.Session(region_name=session.region_name)
+    else:
+        #원본 Session과 같은 자격 증명 객체를 공유 (AssumeRole 자격 증명이라면 만료 전 갱신이 모든 워커에 반영됨)
+        new_session = session_with_credentials(credentials, session.region_name) #새로운 Session 생성
+
+    limiter = rate_limiter_for(session)
+    if limiter is not None: #원본 Session에 속도 제한이 설치되어 있으면 같은 limiter(서비스별 토큰 버킷, 재시도 예산)를 공유
+        limiter.install(new_session)
+    return new_session
+
+#이름별 작업(session을 인자로 받는 함수)을 제한된 크기의 스레드 풀에서 병렬 실행
+def run_tasks(tasks: Dict[str, Callable[[Any], Any]], session, max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Any]:
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks) or 1))) as executor:
+        #각 작업마다 별도의 Session(-> 별도의 client)을 넘겨서 실행
+        futures = {
+            name: executor.submit(task, worker_session(session))
+            for name, task in tasks.items()
+        }
+        #작업 이름을 기준으로 결과를 모아서 반환 (하나라도 실패하면 예외가 그대로 전달됨)
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,316 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Union
+from array import array
+import heapq
+import math
+import threading
+
+from filters.graph_index import GraphIndex
+from filters.graph_delta import GraphDiff
+from filters.overlay import OverlayList
+from graph_builder.policy_engine import PolicyCompiler, version_key
+
+#공격 경로 탐색에 사용하는 relation과 relation별 악용 가능성(0~1, 경로 위험도는 경로 위 edge 값의 곱)
+#- 권한 상승: PassRole, AssumeRole, Lambda 수정, Lambda 실행 역할, SQS 트리거
+#- 마지막 단계: 민감 리소스(Secrets Manager, RDS) 접근
+ATTACK_RELATIONS: Dict[str, float] = {
+    "IAM_USER_CAN_ASSUME_ROLE": 0.9,
+    "IAM_ROLE_CAN_ASSUME_ROLE": 0.9,
+    "IAM_USER_ASSUME_ROLE": 0.9,
+    "ASSUME_ROLE": 0.9,
+    "LAMBDA_ASSUME_ROLE": 0.9,
+    "IAM_USER_CAN_PASS_ROLE": 0.8,
+    "IAM_ROLE_CAN_PASS_ROLE": 0.8,
+    "IAM_USER_CAN_MODIFY_LAMBDA": 0.7,
+    "IAM_ROLE_CAN_MODIFY_LAMBDA": 0.7,
+    "SQS_TRIGGER_LAMBDA": 0.5,
+    "IAM_USER_ACCESS_SECRETSMANAGER": 1.0,
+    "IAM_ROLE_ACCESS_SECRETSMANAGER": 1.0,
+    "IAM_USER_ACCESS_RDS": 0.9,
+    "IAM_ROLE_ACCESS_RDS": 0.9,
+    "EC2_ACCESS_RDS": 0.6,
+}
+
+#도착 지점(sink)으로 보는 node type (관리자 권한 role은 정책 문서로 판단)
+SINK_NODE_TYPES = {"secretsmanager": "secretsmanager", "rds_instance": "rds"}
+
+#탐색 기본값
+DEFAULT_TOP_K = 5
+DEFAULT_MAX_DEPTH = 8
+DEFAULT_MAX_EXPANSIONS = 100000 #꺼낸 부분 경로 수 제한 (넘으면 그때까지 찾은 경로만 반환)
+
+_INF = float("inf")
+
+#정책 문서에 모든 Action, 모든 Resource를 허용하는 Statement가 있는지
+#policies: 컴파일 캐시 (관리형 정책은 (PolicyArn, VersionId), 인라인 정책은 문서 객체 기준으로 한 번만 컴파일)
+def _grants_admin(doc: Any, policies: PolicyCompiler, key: Optional[tuple] = None) -> bool:
+    if not isinstance(doc, dict):
+        return False
+    return any(
+        stmt.effect == "Allow" and not stmt.uses_not_action and "*" in stmt.actions and stmt.all_resources
+        for stmt in policies.policy(doc, key)
+    )
+
+#role node가 관리자 권한인지 (AdministratorAccess 관리형 정책 또는 Action "*", Resource "*" Statement)
+def is_admin_role(node: Dict[str, Any], policies: Optional[PolicyCompiler] = None) -> bool:
+    policies = policies if policies is not None else PolicyCompiler()
+    attributes = node.get("attributes") or {}
+    for policy in attributes.get("attached_policies") or []:
+        if not isinstance(policy, dict):
+            continue
+        policy_arn = policy.get("PolicyArn")
+        if str(policy_arn or "").endswith(":policy/AdministratorAccess"):
+            return True
+        for version in policy.get("Versions", []):
+            if version.get("IsDefaultVersion") is True and _grants_admin(version.get("Document"), policies, version_key(policy, version)):
+                return True
+    for policy in attributes.get("inline_policies") or []:
+        if isinstance(policy, dict) and _grants_admin(policy.get("PolicyDocument"), policies):
+            return True
+    return False
+
+#node가 sink라면 sink 종류, 아니면 None
+def sink_type(node: Dict[str, Any], policies: Optional[PolicyCompiler] = None) -> Optional[str]:
+    node_type = node.get("node_type")
+    if node_type in SINK_NODE_TYPES:
+        return SINK_NODE_TYPES[node_type]
+    if node_type == "iam_role" and is_admin_role(node, policies):
+        return "admin_role"
+    return None
+
+#GraphIndex에서 공격 relation edge만 뽑아 만든 방향 그래프 (directed edge는 src -> dst, 방향 없는 edge는 양방향)
+#- sink까지의 거리(역방향 탐색 결과)는 탐색 방식별로 처음 요청할 때 한 번만 계산하여 재사용 (sink에 도달할 수 없는 node는 탐색에서 제외)
+#- top_paths: sink까지의 거리를 하한으로 사용하는 최우선 탐색으로 짧은(또는 위험도가 높은) 경로부터 k개
+#- 스냅샷 그래프로 만든 인덱스는 스냅샷에 캐시하고, CLI overlay 그래프는 바뀐 node, 새 edge만 얹은 인덱스로 탐색 (overlay)
+#  node 번호: 기본 그래프 node 뒤에 새 node, arc 번호: 기본 그래프 arc 뒤에 새 edge의 arc
+class AttackPathIndex:
+    def __init__(self, index: GraphIndex, relations: Optional[Dict[str, float]] = None, diff: Optional[GraphDiff] = None):
+        self.index = index
+        self.diff = diff #overlay 그래프 비교용 정보 (스냅샷 인덱스만 사용)
+        self.relations = ATTACK_RELATIONS if relations is None else relations
+        self.nodes: Sequence[Dict[str, Any]] = index.nodes
+        self.extra_position: Dict[str, int] = {} #새 node id -> node 번호
+        self.extra_edges: List[Dict[str, Any]] = [] #기본 그래프 arc 뒤에 추가된 arc의 edge
+        node_count = len(index.nodes)
+
+        #relation 번호 -> 악용 가능성 (공격 relation이 아니면 없음)
+        likelihood = {code: self.relations[rel] for code, rel in enumerate(index.relations) if rel in self.relations}
+
+        #정방향/역방향 인접 목록: node 번호 -> [(이웃 node 번호, arc 번호)]
+        self.forward: List[List[tuple]] = [[] for _ in range(node_count)]
+        self.backward: List[List[tuple]] = [[] for _ in range(node_count)]
+        self.likelihood = array("d", [0.0]) * len(index.arc_src)
+        for arc, (src, dst, code) in enumerate(zip(index.arc_src, index.arc_dst, index.arc_relation)):
+            p = likelihood.get(code)
+            if p is None:
+                continue
+            self.likelihood[arc] = p
+            self.forward[src].append((dst, arc))
+            self.backward[dst].append((src, arc))
+            if not index.arc_directed[arc]:
+                self.forward[dst].append((src, arc))
+                self.backward[src].append((dst, arc))
+
+        self.sinks: Dict[int, str] = {}
+        policies = PolicyCompiler() #여러 role에 연결된 같은 관리형 정책은 한 번만 컴파일
+        for pos, node in enumerate(index.nodes):
+            kind = sink_type(node, policies)
+            if kind is not None:
+                self.sinks[pos] = kind
+
+        self._distance: Dict[str, array] = {}
+        self._base: Optional[AttackPathIndex] = None #overlay 인덱스의 스냅샷 인덱스
+        self._new_sinks: List[int] = [] #overlay로 새로 sink가 된 node 번호
+        self._new_arcs: List[tuple] = [] #overlay로 추가된 (출발 node 번호, 도착 node 번호, arc 번호)
+        self._lock = threading.Lock()
+
+    #node id의 node 번호 (그래프에 없으면 None)
+    def position(self, node_id: str) -> Optional[int]:
+        pos = self.index.position.get(node_id)
+        return pos if pos is not None else self.extra_position.get(node_id)
+
+    #arc의 edge
+    def _edge(self, arc: int) -> Dict[str, Any]:
+        base_arcs = len(self.index.arc_edge)
+        if arc < base_arcs:
+            return self.index.edges[self.index.arc_edge[arc]]
+        return self.extra_edges[arc - base_arcs]
+
+    #edge 하나의 비용 ("shortest"는 hop 수, "risk"는 -log(악용 가능성)이라 비용 합이 작을수록 위험도 곱이 큼)
+    def _cost(self, arc: int, mode: str) -> float:
+        if mode == "shortest":
+            return 1.0
+        return -math.log(self.likelihood[arc])
+
+    #node별 가장 가까운 sink까지의 비용 (sink에서 역방향 Dijkstra, 한 번만 계산)
+    def distance_to_sink(self, mode: str) -> array:
+        if mode not in ("shortest", "risk"):
+            raise ValueError(f"unknown mode: {mode}")
+        with self._lock:
+            if mode not in self._distance:
+                if self._base is not None: #스냅샷 인덱스의 거리에서 새 sink, 새 arc의 출발 node부터 다시 줄여나감
+                    distance = array("d", self._base.distance_to_sink(mode))
+                    distance.extend(array("d", [_INF]) * (len(self.nodes) - len(distance)))
+                    start = []
+                    for pos in self._new_sinks:
+                        distance[pos] = 0.0
+                        start.append(pos)
+                    for src, dst, arc in self._new_arcs:
+                        nd = distance[dst] + self._cost(arc, mode)
+                        if nd < distance[src]:
+                            distance[src] = nd
+                            start.append(src)
+                else:
+                    distance = array("d", [_INF]) * len(self.nodes)
+                    start = list(self.sinks)
+                    for pos in start:
+                        distance[pos] = 0.0
+                self._distance[mode] = self._relax(distance, start, mode)
+            return self._distance[mode]
+
+    #start의 node들부터 역방향으로 거리를 줄여나감 (distance에서 start node들의 값은 이미 갱신된 상태)
+    def _relax(self, distance: array, start: List[int], mode: str) -> array:
+        heap = [(distance[pos], pos) for pos in start]
+        heapq.heapify(heap)
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > distance[node]:
+                continue
+            for prev, arc in self.backward[node]:
+                nd = d + self._cost(arc, mode)
+                if nd < distance[prev]:
+                    distance[prev] = nd
+                    heapq.heappush(heap, (nd, prev))
+        return distance
+
+    #CLI overlay 그래프용 인덱스 (스냅샷 인덱스에 바뀐 node, 새 edge만 얹음)
+    #- 새 edge, 새 sink는 거리를 줄이기만 하므로 sink까지의 거리는 스냅샷 인덱스의 거리를 복사하고 바뀐 부분에서부터만 다시 계산
+    #- overlay 그래프를 추가분만으로 나타낼 수 없거나 기존 sink가 sink가 아니게 되면 None (호출한 쪽에서 새로 생성)
+    def overlay(self, graph: Dict[str, Any]) -> Optional["AttackPathIndex"]:
+        delta = self.diff.delta(graph) if self.diff is not None else None
+        if delta is None:
+            return None
+        if not delta.replaced and not delta.new_nodes and not delta.added_edges:
+            return self
+
+        base_count = len(self.nodes)
+        index = object.__new__(AttackPathIndex)
+        index.index = self.index
+        index.diff = None
+        index.relations = self.relations
+        index.nodes = OverlayList(self.nodes, dict(delta.replaced), list(delta.new_nodes.values()))
+        index.extra_position = {node_id: base_count + i for i, node_id in enumerate(delta.new_nodes)}
+        index.extra_edges = []
+        index.forward = self.forward + [[] for _ in delta.new_nodes]
+        index.backward = self.backward + [[] for _ in delta.new_nodes]
+        index.likelihood = array("d", self.likelihood)
+        index._distance = {}
+        index._base = self
+        index._new_sinks = []
+        index._new_arcs = []
+        index._lock = threading.Lock()
+
+        #바뀐 node, 새 node의 sink 여부
+        index.sinks = dict(self.sinks)
+        policies = PolicyCompiler()
+        changed = list(delta.replaced.items()) + [(index.extra_position[node_id], node) for node_id, node in delta.new_nodes.items()]
+        for pos, node in changed:
+            kind = sink_type(node, policies)
+            if kind is None:
+                if pos in self.sinks: #sink가 아니게 되면 거리가 늘어나므로 다시 계산
+                    return None
+                continue
+            if pos not in self.sinks:
+                index._new_sinks.append(pos)
+            index.sinks[pos] = kind
+
+        #새 edge의 arc 추가 (바뀐 node의 인접 목록만 새로 만듦)
+        copied = set()
+
+        def link(adjacency: List[List[tuple]], pos: int, item: tuple) -> None:
+            key = (id(adjacency), pos)
+            if key not in copied:
+                copied.add(key)
+                adjacency[pos] = list(adjacency[pos])
+            adjacency[pos].append(item)
+
+        for edge in delta.added_edges:
+            p = index.relations.get(edge.get("relation"))
+            if p is None:
+                continue
+            src, dst = index.position(edge.get("src")), index.position(edge.get("dst"))
+            arc = len(index.likelihood)
+            index.likelihood.append(p)
+            index.extra_edges.append(edge)
+            link(index.forward, src, (dst, arc))
+            link(index.backward, dst, (src, arc))
+            index._new_arcs.append((src, dst, arc))
+            if not edge.get("directed"):
+                link(index.forward, dst, (src, arc))
+                link(index.backward, src, (dst, arc))
+                index._new_arcs.append((dst, src, arc))
+        return index
+
+    #시작 node들에서 sink까지의 경로를 비용이 낮은 순서로 최대 k개 (같은 node를 두 번 지나지 않는 경로, sink에서 경로 종료)
+    #sink까지의 비용을 하한으로 쓰므로 꺼낸 경로가 곧 남은 경로 중 가장 짧은 경로이고, sink에 도달할 수 없거나 max_depth를 넘는 경로는 넣지 않음
+    def top_paths(self, start_node_ids: List[str], k: int = DEFAULT_TOP_K, mode: str = "shortest",
+                  max_depth: int = DEFAULT_MAX_DEPTH, max_expansions: int = DEFAULT_MAX_EXPANSIONS) -> List[Dict[str, Any]]:
+        distance = self.distance_to_sink(mode)
+        hops = self.distance_to_sink("shortest") #깊이 제한 가지치기용
+
+        heap = []
+        seq = 0 #비용이 같으면 먼저 넣은 경로 먼저
+        for pos in (self.position(n_id) for n_id in start_node_ids):
+            if pos is not None and distance[pos] < _INF and hops[pos] <= max_depth:
+                heap.append((distance[pos], seq, 0.0, (pos,), ()))
+                seq += 1
+        heapq.heapify(heap)
+
+        results = []
+        expansions = 0
+        while heap and len(results) < k and expansions < max_expansions:
+            _, _, cost, nodes, arcs = heapq.heappop(heap)
+            expansions += 1
+            node = nodes[-1]
+            if arcs and node in self.sinks:
+                results.append(self._path(nodes, arcs, cost, mode))
+                continue
+            for neighbor, arc in self.forward[node]:
+                if distance[neighbor] == _INF or len(arcs) + 1 + hops[neighbor] > max_depth or neighbor in nodes:
+                    continue
+                g = cost + self._cost(arc, mode)
+                heapq.heappush(heap, (g + distance[neighbor], seq, g, nodes + (neighbor,), arcs + (arc,)))
+                seq += 1
+
+        return results
+
+    #node 번호, arc 번호 목록을 출력 형식으로 변환
+    def _path(self, nodes: tuple, arcs: tuple, cost: float, mode: str) -> Dict[str, Any]:
+        edges = [self._edge(arc) for arc in arcs]
+        risk = 1.0
+        for arc in arcs:
+            risk *= self.likelihood[arc]
+        return {
+            "source": self.nodes[nodes[0]].get("node_id"),
+            "sink": self.nodes[nodes[-1]].get("node_id"),
+            "sink_type": self.sinks.get(nodes[-1]),
+            "nodes": [self.nodes[pos].get("node_id") for pos in nodes],
+            "edges": [edge.get("id") for edge in edges],
+            "relations": [edge.get("relation") for edge in edges],
+            "hops": len(arcs),
+            "risk": round(risk, 4),
+        }
+
+#그래프에서 시작 node(들)로부터 민감 리소스(Secrets Manager, RDS, 관리자 role)까지의 공격 경로 top-k
+#mode: "shortest"(hop 수가 적은 순) 또는 "risk"(경로 위험도가 높은 순)
+#base: 스냅샷 그래프로 만든 인덱스 (있으면 graph와 다른 부분만 얹어서 탐색, 얹을 수 없으면 graph로 새로 생성)
+def find_attack_paths(graph: Dict[str, Any], start_node_id: Union[str, List[str]], k: int = DEFAULT_TOP_K, mode: str = "shortest",
+                      max_depth: int = DEFAULT_MAX_DEPTH, index: Optional[GraphIndex] = None,
+                      base: Optional[AttackPathIndex] = None) -> List[Dict[str, Any]]:
+    start_node_ids = [start_node_id] if isinstance(start_node_id, str) else list(start_node_id)
+    path_index = base.overlay(graph) if base is not None else None
+    if path_index is None:
+        if index is None:
+            index = GraphIndex(graph.get("nodes", []), graph.get("edges", []))
+        path_index = AttackPathIndex(index)
+    return path_index.top_paths(start_node_ids, k=k, mode=mode, max_depth=max_depth)
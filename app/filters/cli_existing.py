@@ -1,19 +1,20 @@
+from filters.overlay import OverlayList, overlay
+
 #lambda handler에서 호출하는 함수
+#normalized_data, raw_data는 수정하지 않고 CLI 내용이 반영된 새 정규화 데이터, raw data를 반환 (바뀐 node, raw 객체만 새로 만들고 나머지는 공유)
 def handle_existing_resources(existing_cli_nodes: list, normalized_data: dict, raw_data: dict) -> dict:
-    original_node_map = { #기존 정규화 Node들의 node id를 모두 추출
-        n["node_id"]: n
-        for n in normalized_data.get("nodes", [])
+    nodes = overlay(normalized_data.get("nodes", [])) #기존 정규화 Node 목록 위에 CLI로 바뀐 node만 덮어씀
+    node_indexes = { #기존 정규화 Node들의 node id와 위치를 모두 추출
+        n["node_id"]: i
+        for i, n in enumerate(nodes)
     }
 
-    updated_nodes_map = {}
-
     for cli_node in existing_cli_nodes: #cli node들을 순회 (근데 보통 1개만 존재)
         node_id = cli_node["node_id"] #Node id를 추출
-        original_node = original_node_map.get(node_id) #기존 정규화 Node들의 node id 중에서 cli node의 id와 같은 값을 추출
-
-        if not original_node: #만약 기존 node들 중에 cli node와 id가 같은 값이 없다면
-            updated_nodes_map[node_id] = cli_node #cli ndoe를 그대로 업데이트하고
-            continue #종료
+        if node_id not in node_indexes: #만약 기존 node들 중에 cli node와 id가 같은 값이 없다면 종료
+            continue
+        index = node_indexes[node_id]
+        original_node = nodes[index] #기존 정규화 Node들의 node id 중에서 cli node의 id와 같은 값을 추출
 
         merged = original_node.copy() #기존 node를 복사하여
         merged_attrs = original_node.get("attributes", {}).copy() #속성 값 추출
@@ -33,19 +34,14 @@ def handle_existing_resources(existing_cli_nodes: list, normalized_data: dict, r
         merged["attributes"] = merged_attrs #병합된 관리형 정책과, 추가된 인라인 정책 반환
         final_node = merged #최종 final_node에 병합된 정책들을 포함하여 반환
 
-        for i, node in enumerate(normalized_data["nodes"]): #기존 정규화 노드의 인덱스 번호와 노드들을 i, node 변수에 담으며 순회
-            if node["node_id"] == node_id: #만약 node의 id가 cli node의 id와 같다면
-                normalized_data["nodes"][i] = final_node #최종적으로 반환되는 정규화 데이터에 해당 인덱스 값을 가진 노드를 cli 기준으로 최종 병합된 노드로 교체
-
-        updated_nodes_map[node_id] = final_node #update node에도 final node 추가
+        nodes = nodes.with_replaced(index, final_node) #해당 인덱스의 노드를 cli 기준으로 최종 병합된 노드로 교체 (기존 목록은 그대로)
         raw_data = update_raw_from_cli(raw_data, final_node) #edge 생성 단계에서도 사용되기 위해 raw data도 업데이트
 
-    normalized_data["nodes"] = [
-        updated_nodes_map.get(n["node_id"], n)
-        for n in normalized_data.get("nodes", [])
-    ]
+    return {**normalized_data, "nodes": nodes}, raw_data
 
-    return normalized_data, raw_data
+#CLI로 새로 생성되는 node들을 추가한 정규화 데이터 반환 (normalized_data는 수정하지 않음)
+def add_new_resources(new_cli_nodes: list, normalized_data: dict) -> dict:
+    return {**normalized_data, "nodes": overlay(normalized_data.get("nodes", [])).with_added(new_cli_nodes)}
 
 #User에게 추가된 정책이 무엇인지 분류 (AWS 관리형 또는 고객 관리형)
 def classify_policy_arn(arn: str) -> str:
@@ -107,6 +103,7 @@ RAW_FIELD_MAP = { #정규화 node id의 내용을 raw의 필드로 매핑시키
 }
 
 #정규화된 cli node 토대로 기존 인프라의 raw data 업데이트 
+#raw_data는 수정하지 않고 바뀐 raw 객체까지의 경로만 복사한 새 raw data를 반환
 def update_raw_from_cli(raw_data: dict, final_node: dict) -> dict:
     node_type = final_node.get("node_type") #CLI Node에서 node type과
     name = final_node.get("name") #name,
@@ -125,13 +122,17 @@ def update_raw_from_cli(raw_data: dict, final_node: dict) -> dict:
 
     if service_block.get("users"): #node의 users의 값이 존재하면
         items = service_block.get("users") #해당 값을 items에 저장
-        if not isinstance(items, list):
+        if not isinstance(items, (list, OverlayList)):
             return raw_data
 
-        for raw_obj in items: #각 필드를 순회하며
+        updated_items = overlay(items)
+        for index, raw_obj in enumerate(items): #각 필드를 순회하며
             if raw_obj.get(id_field) != name: #id_filed의 값이 name과 다르다면 continue (CLI User만 아래 과정 진행)
                 continue
 
+            raw_obj = dict(raw_obj) #기존 raw 객체는 그대로 두고 복사본을 수정
+            updated_items = updated_items.with_replaced(index, raw_obj)
+
             converted = {}
             for cli_key, raw_key in attr_map.items():
                 if cli_key in cli_attrs: #raw field map의 정규화 필드명이 cli 속성값에 존재한다면
@@ -152,4 +153,20 @@ def update_raw_from_cli(raw_data: dict, final_node: dict) -> dict:
                 #Group Policy는 CLI 기준으로 덮어쓰기
                 raw_obj[k] = v
 
-    return raw_data
\ No newline at end of file
+        updated_block = {**service_block, "users": updated_items}
+        return _replace_shared(raw_data, service_block, updated_block)
+
+    return raw_data
+
+#raw data에서 old 객체가 있던 자리를 new로 바꾼 새 raw data 반환
+#멀티 리전/멀티 계정 raw data는 IAM 객체를 리전별, 계정별 결과와 공유하므로 같은 객체가 있는 위치를 모두 교체 (경로상의 딕셔너리만 복사)
+def _replace_shared(raw_data: dict, old, new) -> dict:
+    changed = {k: new for k, v in raw_data.items() if v is old}
+    for key in ("regions", "accounts"):
+        children = raw_data.get(key)
+        if not isinstance(children, dict):
+            continue
+        replaced = {name: _replace_shared(child, old, new) for name, child in children.items()}
+        if any(replaced[name] is not children[name] for name in children):
+            changed[key] = replaced
+    return {**raw_data, **changed} if changed else raw_data
\ No newline at end of file
@@ -0,0 +1,132 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Union
+from array import array
+
+from filters.graph_delta import GraphDiff
+
+#스냅샷으로 만든 기본 그래프의 연결 요소(방향 무시) 인덱스
+#- union-find로 node 번호 -> 연결 요소 번호(label)를 한 번만 계산하고, 연결 요소별 node 번호, edge 위치 목록을 저장
+#- CLI overlay로 만든 그래프는 overlay가 바꾼 node와 그 node에 연결된 edge만 기본 그래프와 비교해서 연결 요소들을 합치는 방식으로 subgraph 추출 (extract)
+#- diff: 기본 그래프와 overlay 그래프 비교용 정보 (스냅샷에서 공격 경로 인덱스와 같이 사용, 없으면 새로 생성)
+#스냅샷에 캐시되어 여러 호출이 공유하므로 만든 뒤에는 수정하지 않음
+class ComponentIndex:
+    def __init__(self, graph: Dict[str, Any], diff: Optional[GraphDiff] = None):
+        self.diff = diff if diff is not None else GraphDiff(graph)
+        index = self.diff.index
+        self.index = index
+        node_count = len(index.nodes)
+
+        #union-find (경로 압축 + 크기 기준 합치기)
+        parent = array("l", range(node_count))
+        size = array("l", [1]) * node_count
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for src, dst in zip(index.arc_src, index.arc_dst):
+            a, b = find(src), find(dst)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+
+        #연결 요소 번호를 0부터 다시 매기고 연결 요소별 node 목록 생성
+        self.label = array("l", [0]) * node_count
+        self.members: List[List[int]] = []
+        root_label: Dict[int, int] = {}
+        for node in range(node_count):
+            root = find(node)
+            label = root_label.get(root)
+            if label is None:
+                label = root_label[root] = len(self.members)
+                self.members.append([])
+            self.label[node] = label
+            self.members[label].append(node)
+
+        #연결 요소별 edge 위치 목록 (edge id가 같은 arc가 여러 연결 요소에 걸치면 각 연결 요소에 포함)
+        self.member_edges: List[List[int]] = [[] for _ in self.members]
+        added = set()
+        for src, slot in zip(index.arc_src, index.arc_edge):
+            label = self.label[src]
+            if (label, slot) not in added:
+                added.add((label, slot))
+                self.member_edges[label].append(slot)
+
+    #node id가 속한 연결 요소 번호 (기본 그래프에 없는 node면 None)
+    def component_of(self, node_id: str) -> Optional[int]:
+        pos = self.index.position.get(node_id)
+        return None if pos is None else self.label[pos]
+
+    #CLI overlay가 반영된 그래프에서 시작 node들과 연결된 subgraph 추출
+    #- overlay가 교체/추가한 node와 그 node에 연결된 새 edge만 보고, 새 edge로 이어지는 연결 요소들을 합쳐서 반환 (그래프 전체 node, edge를 비교하지 않음)
+    #- 기본 그래프의 edge가 사라졌거나 edge id가 겹치는 경우처럼 합치기만으로 계산할 수 없으면 None (호출한 쪽에서 전체 탐색)
+    def extract(self, graph: Dict[str, Any], start_node_id: Union[str, List[str]]) -> Optional[Dict[str, List]]:
+        index = self.index
+        position = index.position
+        delta = self.diff.delta(graph)
+        if delta is None:
+            return None
+        new_nodes, replaced, added_edges = delta.new_nodes, delta.replaced, delta.added_edges
+
+        #연결 요소("c", 번호)와 새 node("n", id)를 새 edge 기준으로 합침
+        parent: Dict[tuple, tuple] = {}
+
+        def find(item: tuple) -> tuple:
+            root = item
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while item != root: #경로 압축
+                parent[item], item = root, parent[item]
+            return root
+
+        def item_of(node_id: str) -> Optional[tuple]:
+            pos = position.get(node_id)
+            if pos is not None:
+                return ("c", self.label[pos])
+            if node_id in new_nodes:
+                return ("n", node_id)
+            return None
+
+        new_edges = []
+        new_edge_ids = set()
+        for edge in added_edges:
+            src, dst = item_of(edge.get("src")), item_of(edge.get("dst"))
+            if src is None or dst is None: #양 끝 node가 그래프에 없는 edge는 제외
+                continue
+            e_id = edge.get("id")
+            if e_id in index.edge_slot or e_id in new_edge_ids: #edge id가 겹치면 어느 edge를 남길지 달라지므로 전체 탐색
+                return None
+            new_edge_ids.add(e_id)
+            a, b = find(src), find(dst)
+            if a != b:
+                parent[b] = a
+            new_edges.append((edge, src))
+
+        start_node_ids = [start_node_id] if isinstance(start_node_id, str) else list(start_node_id)
+        start_items = [item for item in (item_of(n_id) for n_id in start_node_ids) if item is not None]
+        if not start_items:
+            return {"nodes": [], "edges": []}
+        roots = {find(item) for item in start_items}
+
+        #시작 node와 같은 그룹인 연결 요소, 새 node 선택
+        chosen = sorted({item for item in set(parent) | set(start_items) if find(item) in roots})
+        nodes = []
+        edges = []
+        edge_seen = set()
+        for kind, value in chosen:
+            if kind == "c":
+                nodes.extend(replaced.get(pos, index.nodes[pos]) for pos in self.members[value])
+                for slot in self.member_edges[value]:
+                    if slot not in edge_seen:
+                        edge_seen.add(slot)
+                        edges.append(index.edges[slot])
+            else:
+                nodes.append(new_nodes[value])
+        edges.extend(edge for edge, src in new_edges if find(src) in roots)
+
+        return {"nodes": nodes, "edges": edges}
@@ -1,50 +1,40 @@
-from typing import Dict, List, Set, Any
+from typing import Collection, Dict, List, Set, Any, Union, Optional
 
+from filters.graph_index import GraphIndex
+
+#start_node_id는 node id 하나 또는 여러 개(CLI 스크립트로 바뀐 node들)의 리스트
+#index: 같은 그래프로 만든 GraphIndex (여러 시작 node에 대해 추출할 때 한 번만 만들어서 재사용, 없으면 새로 생성)
+#추출 범위 제한 (모두 기본값이면 시작 node들과 연결된 연결 요소 전체)
+#- max_hops: 시작 node로부터 최대 edge 수
+#- relations: 따라갈 relation 목록
+#- direction: "both"(방향 무시), "out"(directed edge는 src -> dst로만), "in"(directed edge는 dst -> src로만)
+#- node_budget: 포함할 최대 node 수 (가까운 node부터)
 def extract_connected_subgraph(
     graph_nodes: List[Dict[str, Any]], 
     graph_edges: List[Dict[str, Any]],
-    start_node_id: str,
+    start_node_id: Union[str, List[str]],
+    index: Optional[GraphIndex] = None,
+    max_hops: Optional[int] = None,
+    relations: Optional[Collection[str]] = None,
+    direction: str = "both",
+    node_budget: Optional[int] = None,
 ) -> Dict[str, List]:
 
-    node_index = {
-        n.get("node_id"): n
-        for n in graph_nodes
-        if n.get("node_id")
-    }
-    adj = {n_id: [] for n_id in node_index}
-    edge_map = {}
-    
-    if start_node_id not in node_index:
-        return {"nodes": [], "edges": []}
-
-    for edge in graph_edges:
-        e_id = edge.get("id")
-        src = edge.get("src")
-        dst = edge.get("dst")
-        
-        if src in adj and dst in adj:
-            adj[src].append((dst, e_id))
-            adj[dst].append((src, e_id))
-            edge_map[e_id] = edge
-
-    visited_nodes: Set[str] = set()
-    visited_edges: Set[str] = set()
-    queue: List[str] = [start_node_id]
+    if index is None:
+        index = GraphIndex(graph_nodes, graph_edges)
 
-    while queue:
-        current_node_id = queue.pop(0)
-
-        if current_node_id in visited_nodes:
-            continue
-
-        visited_nodes.add(current_node_id)
+    start_node_ids = [start_node_id] if isinstance(start_node_id, str) else list(start_node_id)
+    start = index.node_numbers(start_node_ids)
+    if not start:
+        return {"nodes": [], "edges": []}
 
-        for neighbor_id, e_id in adj.get(current_node_id, []):
-            visited_edges.add(e_id)
-            if neighbor_id not in visited_nodes:
-                queue.append(neighbor_id)
+    if is_bounded(max_hops, relations, direction, node_budget): #시작 node에서 가까운 node부터 제한 조건 안에서만 탐색
+        node_numbers, edge_slots = index.k_hop(start, max_hops, relations, direction, node_budget)
+    else: #시작 node들과 직접, 간접 연결된 node, edge (방향 무시)
+        node_numbers, edge_slots = index.component(start)
+    return index.subgraph(node_numbers, edge_slots)
 
-    return {
-        "nodes": [node_index[nid] for nid in visited_nodes],
-        "edges": [edge_map[eid] for eid in visited_edges],
-    }
\ No newline at end of file
+#추출 범위 제한 옵션이 하나라도 지정되었는지
+def is_bounded(max_hops: Optional[int] = None, relations: Optional[Collection[str]] = None,
+               direction: str = "both", node_budget: Optional[int] = None) -> bool:
+    return max_hops is not None or relations is not None or direction != "both" or node_budget is not None
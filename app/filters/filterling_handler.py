@@ -1,7 +1,7 @@
 #node, edge에서 공격 탐지에 영향을 주는 필드만 추출
 
 from datetime import datetime
-from filters.filter import extract_connected_subgraph
+from filters.filter import extract_connected_subgraph, is_bounded
 from filters.ec2 import extract_ec2_for_vector
 from filters.rds import extract_rds_for_vector
 from filters.edge import extract_edges_for_vector
@@ -14,8 +14,12 @@ from filters.sqs import extract_sqs_for_vector
 from filters.subnet import extract_subnet_for_vector
 from filters.vpc import extract_vpc_for_vector
 from filters.secretsmanager import extract_secretsmanager_for_vector
+from graph_builder.policy_engine import PolicyCompiler
 
-def run_filtering(full_graph: dict, start_node_id: str) -> dict:
+def run_filtering(full_graph: dict, start_node_id, graph_index=None, components=None,
+                  max_hops=None, relations=None, direction="both", node_budget=None) -> dict: #start_node_id는 node id 하나 또는 node id 리스트, graph_index는 full_graph로 미리 만든 GraphIndex (선택)
+    #components는 스냅샷의 기본 그래프로 미리 만든 ComponentIndex (선택, full_graph는 기본 그래프에 CLI overlay를 반영한 그래프)
+    #max_hops, relations, direction, node_budget은 추출 범위 제한 (extract_connected_subgraph 참고, 지정하지 않으면 연결 요소 전체)
     #전체 node, edge를 가져와서 각각 nodes, edges에 넣어두고
     nodes = full_graph.get("nodes", [])
     edges = full_graph.get("edges", [])
@@ -24,13 +28,20 @@ def run_filtering(full_graph: dict, start_node_id: str) -> dict:
         return {"nodes": [], "edges": []}
     
     #시작 node를 기준으로 간접, 직접 연결된 node와 edge들 추출
-    subgraph = extract_connected_subgraph(graph_nodes=nodes, graph_edges=edges, start_node_id=start_node_id)
+    #미리 계산한 연결 요소가 있으면 overlay로 바뀐 부분만 비교해서 추출하고, 그렇게 계산할 수 없으면 전체 탐색 (범위 제한이 있으면 항상 탐색)
+    bounded = is_bounded(max_hops, relations, direction, node_budget)
+    subgraph = components.extract(full_graph, start_node_id) if components is not None and not bounded else None
+    if subgraph is None:
+        subgraph = extract_connected_subgraph(graph_nodes=nodes, graph_edges=edges, start_node_id=start_node_id, index=graph_index,
+                                              max_hops=max_hops, relations=relations, direction=direction, node_budget=node_budget)
+
+    policies = PolicyCompiler() #IAM user/role의 정책 요약 캐시 (여러 principal에 연결된 같은 정책 문서는 한 번만 요약)
 
     refine_map = { #node의 type에 따라 필드를 정제하기 위한 매핑 리스트 생성해두고,
         "ec2_instance": extract_ec2_for_vector,
         "rds_instance": extract_rds_for_vector,
-        "iam_role": extract_iam_role_for_vector,
-        "iam_user": extract_iam_user_for_vector,
+        "iam_role": lambda data: extract_iam_role_for_vector(data, policies),
+        "iam_user": lambda data: extract_iam_user_for_vector(data, policies),
         "igw": extract_igw_for_vector,
         "lambda": extract_lambda_for_vector,
         "route_table": extract_route_table_for_vector,
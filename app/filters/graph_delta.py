@@ -0,0 +1,112 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence
+
+from filters.graph_index import GraphIndex
+from filters.overlay import OverlayList
+
+#edge 비교용 키 (graph builder가 만드는 edge 필드)
+def edge_key(edge: Dict[str, Any]) -> tuple:
+    return (edge.get("id"), edge.get("relation"), edge.get("src"), edge.get("dst"), edge.get("directed"), edge.get("conditions"))
+
+#스냅샷 그래프 대비 CLI overlay 그래프에서 바뀐 부분
+#- replaced: 기본 그래프 node 번호 -> 교체된 node (기존 리소스에 CLI 내용을 덮어쓴 경우)
+#- new_nodes: 기본 그래프에 없는 node id -> node (CLI로 새로 생성되는 리소스, 처음 등장한 순서)
+#- added_edges: 바뀐 node에 연결된 edge 중 기본 그래프에 없는 edge (양 끝 node가 그래프에 있는 edge만)
+class GraphDelta:
+    def __init__(self, replaced: Dict[int, Dict[str, Any]], new_nodes: Dict[str, Dict[str, Any]], added_edges: List[Dict[str, Any]]):
+        self.replaced = replaced
+        self.new_nodes = new_nodes
+        self.added_edges = added_edges
+
+#스냅샷 그래프(CLI 반영 전)와 overlay 그래프를 비교하기 위한 기본 정보
+#- CLI overlay는 스냅샷 node 목록 위의 OverlayList이므로 바뀐 node는 overlay가 들고 있는 교체/추가 항목만 보면 됨
+#- graph builder는 edge를 양 끝 리소스의 내용으로 만들기 때문에 바뀐 node에 연결된 edge만 기본 그래프와 비교
+#  (바뀐 node에 연결되지 않은 edge의 개수가 기본 그래프와 다르면 비교할 수 없는 것으로 보고 None)
+#스냅샷에 캐시되어 여러 호출이 공유하므로 비교 기준 정보는 만든 뒤에는 수정하지 않음
+#마지막으로 비교한 overlay 그래프의 결과는 기억해두고 같은 그래프를 다시 비교하면 그대로 반환 (연결 요소, 공격 경로, 도달 가능성 인덱스가 CLI 하나에 대해 한 번만 비교)
+class GraphDiff:
+    def __init__(self, graph: Dict[str, Any], index: Optional[GraphIndex] = None):
+        self.nodes = graph.get("nodes", [])
+        self.edges = graph.get("edges", [])
+        self.index = index if index is not None else GraphIndex(self.nodes, self.edges)
+
+        #node id -> 연결된 edge 위치 목록 (self.edges 기준, 양 끝 node가 그래프에 없는 edge 포함)
+        self.incident: Dict[str, List[int]] = {}
+        for i, edge in enumerate(self.edges):
+            src, dst = edge.get("src"), edge.get("dst")
+            self.incident.setdefault(src, []).append(i)
+            if dst != src:
+                self.incident.setdefault(dst, []).append(i)
+
+        self._last: Optional[tuple] = None #(node 목록, edge 목록, 비교 결과) 마지막으로 비교한 overlay 그래프
+
+    #overlay 그래프의 바뀐 부분 (기본 그래프의 node나 edge가 사라졌거나 바뀌어서 추가분만으로 나타낼 수 없으면 None)
+    def delta(self, graph: Dict[str, Any]) -> Optional[GraphDelta]:
+        nodes, edges = graph.get("nodes", []), graph.get("edges", [])
+        last = self._last #다른 스레드가 바꿔도 한 번 읽은 값으로 비교 (목록 객체를 함께 보관하므로 id 재사용 없음)
+        if last is not None and last[0] is nodes and last[1] is edges:
+            return last[2]
+        delta = self._delta(nodes, edges)
+        self._last = (nodes, edges, delta)
+        return delta
+
+    def _delta(self, nodes: Sequence[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Optional[GraphDelta]:
+        index = self.index
+        position = index.position
+        if nodes is self.nodes:
+            replaced_items, added_items = {}, []
+        elif isinstance(nodes, OverlayList) and nodes.base is self.nodes:
+            replaced_items, added_items = nodes.changes()
+        else: #스냅샷 node 목록 위의 overlay가 아니면 비교할 수 없음
+            return None
+
+        #node: 교체된 항목은 기본 그래프의 같은 node를 대신하고, 추가된 항목은 새 node (같은 id가 이미 있으면 그 node를 교체)
+        replaced: Dict[int, Dict[str, Any]] = {}
+        new_nodes: Dict[str, Dict[str, Any]] = {}
+        for i, node in replaced_items.items():
+            original = self.nodes[i]
+            pos = position.get(original.get("node_id"))
+            if node.get("node_id") != original.get("node_id") or pos is None or index.nodes[pos] is not original:
+                return None
+            replaced[pos] = node
+        for node in added_items:
+            node_id = node.get("node_id")
+            if not node_id:
+                continue
+            pos = position.get(node_id)
+            if pos is not None:
+                replaced[pos] = node
+            else:
+                new_nodes[node_id] = node
+        changed = {index.nodes[pos].get("node_id") for pos in replaced} | set(new_nodes)
+
+        #edge: 바뀐 node에 연결된 edge만 비교 (edge 키는 edge마다 한 번만 생성)
+        base_touching = set()
+        for node_id in changed:
+            base_touching.update(self.incident.get(node_id, ()))
+        base_keys = {
+            edge_key(self.edges[i]) for i in base_touching
+            if self.edges[i].get("src") in position and self.edges[i].get("dst") in position
+        }
+
+        touching = 0
+        matched = set()
+        added_edges = []
+        for edge in edges:
+            src, dst = edge.get("src"), edge.get("dst")
+            if src not in changed and dst not in changed:
+                continue
+            touching += 1
+            if (src not in position and src not in new_nodes) or (dst not in position and dst not in new_nodes): #양 끝 node가 그래프에 없는 edge는 제외
+                continue
+            key = edge_key(edge)
+            if key in base_keys:
+                matched.add(key)
+            else:
+                added_edges.append(edge)
+
+        if len(matched) != len(base_keys): #바뀐 node에 연결되어 있던 기본 그래프의 edge가 사라지거나 바뀜
+            return None
+        if len(edges) - touching != len(self.edges) - len(base_touching): #바뀐 node와 관계없는 edge가 달라짐
+            return None
+        return GraphDelta(replaced, new_nodes, added_edges)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+from array import array
+from collections import deque
+
+#그래프(node, edge 목록)를 정수 node 번호 기반의 CSR(Compressed Sparse Row) 인접 구조로 변환한 인덱스
+#- node 번호 i의 이웃은 adj_node[offsets[i]:offsets[i + 1]], 각 이웃으로 가는 arc 번호는 adj_arc의 같은 위치
+#- arc: 양 끝 node가 모두 존재하는 edge 하나 (arc_src, arc_dst, arc_edge -> self.edges의 위치)
+#- arc마다 relation 번호(arc_relation -> self.relations의 위치)와 방향 여부(arc_directed)를 저장
+#- edge id가 같은 edge가 여러 개면 마지막 edge를 사용 (기존 edge_map과 동일)
+#한 번 만들어두면 여러 시작 node에 대해 연결 요소, k-hop 추출을 반복할 수 있음
+class GraphIndex:
+    def __init__(self, nodes: Iterable[Dict[str, Any]], edges: Iterable[Dict[str, Any]]):
+        self.nodes: List[Dict[str, Any]] = []
+        self.position: Dict[str, int] = {} #node id -> node 번호
+        for node in nodes:
+            node_id = node.get("node_id")
+            if not node_id:
+                continue
+            if node_id in self.position: #같은 node id는 마지막 node 사용
+                self.nodes[self.position[node_id]] = node
+                continue
+            self.position[node_id] = len(self.nodes)
+            self.nodes.append(node)
+
+        self.edges: List[Dict[str, Any]] = []
+        self.edge_slot: Dict[Any, int] = {} #edge id -> self.edges의 위치
+        edge_slot = self.edge_slot
+        self.arc_src = array("l")
+        self.arc_dst = array("l")
+        self.arc_edge = array("l")
+        self.arc_relation = array("l")
+        self.arc_directed = bytearray()
+        self.relations: List[Any] = [] #relation 번호 -> relation
+        self.relation_code: Dict[Any, int] = {} #relation -> relation 번호
+        position = self.position
+        for edge in edges:
+            src = position.get(edge.get("src"))
+            dst = position.get(edge.get("dst"))
+            if src is None or dst is None: #양 끝 node가 그래프에 없는 edge는 제외
+                continue
+            e_id = edge.get("id")
+            slot = edge_slot.get(e_id)
+            if slot is None:
+                slot = edge_slot[e_id] = len(self.edges)
+                self.edges.append(edge)
+            else:
+                self.edges[slot] = edge
+            self.arc_src.append(src)
+            self.arc_dst.append(dst)
+            self.arc_edge.append(slot)
+            relation = edge.get("relation")
+            code = self.relation_code.get(relation)
+            if code is None:
+                code = self.relation_code[relation] = len(self.relations)
+                self.relations.append(relation)
+            self.arc_relation.append(code)
+            self.arc_directed.append(1 if edge.get("directed") else 0)
+
+        self._build_csr()
+
+    #arc 목록으로 CSR 배열 생성 (방향과 관계없이 양쪽 node에서 모두 이웃으로 등록)
+    #adj_out: 해당 위치가 src 쪽에서 dst로 나가는 방향이면 1, dst 쪽에서 src로 거슬러 가는 방향이면 0
+    def _build_csr(self) -> None:
+        node_count = len(self.nodes)
+        offsets = array("l", [0]) * (node_count + 1)
+        for src, dst in zip(self.arc_src, self.arc_dst):
+            offsets[src + 1] += 1
+            offsets[dst + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array("l", offsets[:node_count])
+        adj_node = array("l", [0]) * offsets[node_count]
+        adj_arc = array("l", [0]) * offsets[node_count]
+        adj_out = bytearray(offsets[node_count])
+        for arc, (src, dst) in enumerate(zip(self.arc_src, self.arc_dst)):
+            adj_node[cursor[src]] = dst
+            adj_arc[cursor[src]] = arc
+            adj_out[cursor[src]] = 1
+            cursor[src] += 1
+            adj_node[cursor[dst]] = src
+            adj_arc[cursor[dst]] = arc
+            cursor[dst] += 1
+
+        self.offsets = offsets
+        self.adj_node = adj_node
+        self.adj_arc = adj_arc
+        self.adj_out = adj_out
+
+    #node id 목록 중 그래프에 존재하는 node들의 번호
+    def node_numbers(self, node_ids: Iterable[str]) -> List[int]:
+        return [self.position[n_id] for n_id in node_ids if n_id in self.position]
+
+    #시작 node들과 직접, 간접 연결된 node 번호, edge 위치 (방문 순서)
+    def component(self, start: List[int]) -> Tuple[List[int], List[int]]:
+        return self.k_hop(start, None)
+
+    #시작 node들로부터 max_hops 이내의 node 번호, edge 위치 (max_hops가 None이면 제한 없음)
+    #- 큐는 deque를 사용하여 pop이 O(1)
+    #- max_hops 거리에 있는 node에서 더 나가는 edge는 포함하지 않음
+    #- relations: 따라갈 relation 목록 (None이면 전체)
+    #- direction: "both"이면 방향 무시, "out"이면 directed edge는 src -> dst로만, "in"이면 dst -> src로만 이동 (방향 없는 edge는 항상 양방향)
+    #- node_budget: 포함할 최대 node 수 (가까운 node부터 채우고, 넘으면 더 이상 node를 추가하지 않음, 이미 포함된 node 사이의 edge는 포함)
+    def k_hop(self, start: List[int], max_hops: Optional[int], relations: Optional[Collection[Any]] = None,
+              direction: str = "both", node_budget: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        if direction not in ("both", "out", "in"):
+            raise ValueError(f"unknown direction: {direction}")
+        allowed = None if relations is None else {self.relation_code[r] for r in relations if r in self.relation_code}
+        forward = 1 if direction == "out" else 0 #direction이 "out"이면 adj_out이 1인 위치, "in"이면 0인 위치만 directed edge로 이동 가능
+        budget = len(self.nodes) if node_budget is None else node_budget
+
+        visited = bytearray(len(self.nodes))
+        edge_seen = bytearray(len(self.edges))
+        depth = array("l", [0]) * len(self.nodes)
+        order: List[int] = []
+        edge_order: List[int] = []
+        queue = deque()
+        for node in start:
+            if not visited[node] and len(order) < budget:
+                visited[node] = 1
+                depth[node] = 0
+                order.append(node)
+                queue.append(node)
+
+        offsets, adj_node, adj_arc, arc_edge = self.offsets, self.adj_node, self.adj_arc, self.arc_edge
+        adj_out, arc_relation, arc_directed = self.adj_out, self.arc_relation, self.arc_directed
+        while queue:
+            node = queue.popleft()
+            if max_hops is not None and depth[node] >= max_hops:
+                continue
+            for i in range(offsets[node], offsets[node + 1]):
+                arc = adj_arc[i]
+                if allowed is not None and arc_relation[arc] not in allowed:
+                    continue
+                if direction != "both" and arc_directed[arc] and adj_out[i] != forward:
+                    continue
+                neighbor = adj_node[i]
+                if not visited[neighbor]:
+                    if len(order) >= budget: #node 수 제한에 걸리면 새 node로 가는 edge는 제외
+                        continue
+                    visited[neighbor] = 1
+                    depth[neighbor] = depth[node] + 1
+                    order.append(neighbor)
+                    queue.append(neighbor)
+                slot = arc_edge[arc]
+                if not edge_seen[slot]:
+                    edge_seen[slot] = 1
+                    edge_order.append(slot)
+
+        return order, edge_order
+
+    #node 번호, edge 위치 목록을 node, edge 딕셔너리 목록으로 변환
+    def subgraph(self, node_numbers: List[int], edge_slots: List[int]) -> Dict[str, List]:
+        return {
+            "nodes": [self.nodes[i] for i in node_numbers],
+            "edges": [self.edges[i] for i in edge_slots],
+        }
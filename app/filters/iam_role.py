@@ -1,5 +1,15 @@
-def extract_iam_role_for_vector(graph_data: dict) -> dict:
+from typing import Optional
+
+from graph_builder.policy_engine import PolicyCompiler, version_key
+
+#role 정책 요약의 필드 순서와 Action 기본값 (Action이 없으면 빈 목록)
+VECTOR_FIELDS = ("Action", "Effect", "Resource")
+VECTOR_DEFAULTS = {"Action": []}
+
+#policies: 정책 문서별 Statement 요약 캐시 (run_filtering에서 한 번 만들어 모든 node가 공유, 없으면 이 호출에서만 사용)
+def extract_iam_role_for_vector(graph_data: dict, policies: Optional[PolicyCompiler] = None) -> dict:
     vector_nodes = []
+    policies = policies if policies is not None else PolicyCompiler()
 
     for node in graph_data.get("nodes", []):
         if node.get("node_type") != "iam_role":
@@ -28,13 +38,7 @@ def extract_iam_role_for_vector(graph_data: dict) -> dict:
                     continue
 
                 policy_doc = policy.get("PolicyDocument", {})
-                statements = []
-                for stmt in policy_doc.get("Statement", []):
-                    statements.append({
-                        "Action": stmt.get("Action", []),
-                        "Effect": stmt.get("Effect"),
-                        "Resource": stmt.get("Resource"),
-                    })
+                statements = policies.summary(policy_doc, VECTOR_FIELDS, VECTOR_DEFAULTS)
 
                 inline_policies.append({
                     "PolicyName": policy.get("PolicyName"),
@@ -53,13 +57,7 @@ def extract_iam_role_for_vector(graph_data: dict) -> dict:
                 for version in policy.get("Versions", []):
                     if version.get("IsDefaultVersion") is True:
                         doc = version.get("Document", {})
-                        statements = []
-                        for stmt in doc.get("Statement", []):
-                            statements.append({
-                                "Action": stmt.get("Action", []),
-                                "Effect": stmt.get("Effect"),
-                                "Resource": stmt.get("Resource"),
-                            })
+                        statements = policies.summary(doc, VECTOR_FIELDS, VECTOR_DEFAULTS, version_key(policy, version))
 
                         attached_policies.append({
                             "PolicyName": policy.get("PolicyName"),
@@ -1,5 +1,11 @@
-def extract_iam_user_for_vector(graph_data: dict) -> dict:
+from typing import Optional
+
+from graph_builder.policy_engine import PolicyCompiler, version_key
+
+#policies: 정책 문서별 Statement 요약 캐시 (run_filtering에서 한 번 만들어 모든 node가 공유, 없으면 이 호출에서만 사용)
+def extract_iam_user_for_vector(graph_data: dict, policies: Optional[PolicyCompiler] = None) -> dict:
     vector_nodes = []
+    policies = policies if policies is not None else PolicyCompiler()
 
     user_nodes = graph_data.get("iam_user", {}).get("nodes", []) or graph_data.get("nodes", [])
 
@@ -19,12 +25,7 @@ def extract_iam_user_for_vector(graph_data: dict) -> dict:
                 continue
 
             policy_doc = policy.get("PolicyDocument", {})
-            for stmt in policy_doc.get("Statement", []):
-                inline_policies.append({
-                    "Effect": stmt.get("Effect"),
-                    "Action": stmt.get("Action"),
-                    "Resource": stmt.get("Resource"),
-                })
+            inline_policies.extend(policies.summary(policy_doc))
 
         # -------- Attached Policies --------
         for policy in attributes.get("attached_policies", []):
@@ -33,12 +34,7 @@ def extract_iam_user_for_vector(graph_data: dict) -> dict:
 
             for version in policy.get("Versions", []):
                 if version.get("IsDefaultVersion") is True:
-                    for stmt in version.get("Document", {}).get("Statement", []):
-                        attached_policies.append({
-                            "Effect": stmt.get("Effect"),
-                            "Action": stmt.get("Action"),
-                            "Resource": stmt.get("Resource"),
-                        })
+                    attached_policies.extend(policies.summary(version.get("Document", {}), key=version_key(policy, version)))
 
         # -------- Group Policies --------
         for group_policy_list in attributes.get("group_policies", []):
@@ -50,12 +46,7 @@ def extract_iam_user_for_vector(graph_data: dict) -> dict:
                     continue
 
                 policy_doc = policy.get("PolicyDocument", {})
-                for stmt in policy_doc.get("Statement", []):
-                    group_policies.append({
-                        "Effect": stmt.get("Effect"),
-                        "Action": stmt.get("Action"),
-                        "Resource": stmt.get("Resource"),
-                    })
+                group_policies.extend(policies.summary(policy_doc))
 
         iam_user_vector_node = {
             "node_id": node.get("node_id"),
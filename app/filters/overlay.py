@@ -0,0 +1,71 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+#수집된 스냅샷(base)은 그대로 두고 CLI로 바뀐 내용만 따로 들고 있는 읽기 전용 리스트
+#- replaced: base의 인덱스 -> 교체된 항목 (기존 리소스에 CLI 내용을 덮어쓴 경우)
+#- added: base 뒤에 추가된 항목 (CLI로 새로 생성되는 리소스)
+#- 같은 스냅샷으로 여러 CLI를 평가해도 CLI마다 바뀐 항목만큼의 메모리만 사용
+class OverlayList(Sequence):
+    def __init__(self, base: Sequence, replaced: Optional[Dict[int, Any]] = None, added: Optional[List[Any]] = None):
+        if isinstance(base, OverlayList): #overlay 위에 overlay를 쌓지 않고 하나로 합침
+            replaced = {**base._replaced, **(replaced or {})}
+            added = base._added + (added or [])
+            base = base._base
+        self._base = base
+        self._replaced = replaced or {}
+        self._added = added or []
+
+    #overlay 아래의 원래 리스트
+    @property
+    def base(self) -> Sequence:
+        return self._base
+
+    #base에서 바뀐 항목: (base 인덱스 -> 교체된 항목, 추가된 항목 목록)
+    def changes(self) -> tuple:
+        return dict(self._replaced), list(self._added)
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("OverlayList index out of range")
+        if index < len(self._base):
+            return self._replaced.get(index, self._base[index])
+        return self._added[index - len(self._base)]
+
+    def __iter__(self) -> Iterator[Any]:
+        replaced = self._replaced
+        for index, item in enumerate(self._base):
+            yield replaced.get(index, item)
+        yield from self._added
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, OverlayList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"OverlayList({list(self)!r})"
+
+    #index 위치의 항목을 교체한 새 overlay 반환 (자기 자신과 base는 그대로)
+    def with_replaced(self, index: int, item: Any) -> "OverlayList":
+        if index < 0:
+            index += len(self)
+        if index < len(self._base):
+            return OverlayList(self._base, {**self._replaced, index: item}, self._added)
+        added = list(self._added)
+        added[index - len(self._base)] = item
+        return OverlayList(self._base, self._replaced, added)
+
+    #items를 뒤에 추가한 새 overlay 반환
+    def with_added(self, items: Sequence) -> "OverlayList":
+        return OverlayList(self._base, self._replaced, self._added + list(items))
+
+#리스트를 overlay로 감싸서 반환 (이미 overlay면 그대로)
+def overlay(items: Sequence) -> OverlayList:
+    return items if isinstance(items, OverlayList) else OverlayList(items)
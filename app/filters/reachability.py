@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from filters.graph_delta import GraphDiff
+
+#권한 상승 relation (AssumeRole 체인, PassRole, Lambda 수정 등 IAM_*_CAN_* edge)
+ESCALATION_RELATIONS = {"ASSUME_ROLE", "IAM_USER_ASSUME_ROLE", "LAMBDA_ASSUME_ROLE"}
+ESCALATION_PREFIXES = ("IAM_USER_CAN_", "IAM_ROLE_CAN_")
+
+def is_escalation(relation: Any) -> bool:
+    return relation in ESCALATION_RELATIONS or (isinstance(relation, str) and relation.startswith(ESCALATION_PREFIXES))
+
+#그래프에서 권한 상승 edge의 (src, dst) 목록 (양 끝 node가 그래프에 있는 edge만, 방향 없는 edge는 양방향)
+def escalation_pairs(graph: Dict[str, Any]) -> FrozenSet[Tuple[str, str]]:
+    node_ids = {node.get("node_id") for node in graph.get("nodes", []) if node.get("node_id")}
+    return edge_pairs(graph.get("edges", []), node_ids)
+
+#edge 목록 중 권한 상승 edge의 (src, dst) 목록 (node_ids가 있으면 양 끝 node가 node_ids에 있는 edge만)
+def edge_pairs(edges: Iterable[Dict[str, Any]], node_ids: Optional[Set[str]] = None) -> FrozenSet[Tuple[str, str]]:
+    pairs = set()
+    for edge in edges:
+        if not is_escalation(edge.get("relation")):
+            continue
+        src, dst = edge.get("src"), edge.get("dst")
+        if node_ids is not None and (src not in node_ids or dst not in node_ids):
+            continue
+        pairs.add((src, dst))
+        if not edge.get("directed"):
+            pairs.add((dst, src))
+    return frozenset(pairs)
+
+#비트셋(int)에서 켜진 비트 번호 목록
+def _bits(bitset: int) -> List[int]:
+    text = bin(bitset)[:1:-1] #낮은 비트부터
+    return [i for i, bit in enumerate(text) if bit == "1"]
+
+#권한 상승 edge만으로 만든 전이 폐쇄(transitive closure) 인덱스
+#- Tarjan 알고리즘으로 SCC(서로 도달 가능한 node 묶음)를 하나의 component로 합친 DAG를 만들고
+#- component별로 도달 가능한 component 집합을 비트셋(Python int)으로 저장 (Tarjan은 후속 component를 먼저 완성하므로 완성 순서대로 OR)
+#- can_reach는 component 번호 조회 + 비트 검사 한 번
+#- CLI overlay로 권한 상승 edge가 추가되면 with_edges로 기존 비트셋을 갱신한 새 인덱스를 만듦 (스냅샷에 캐시된 인덱스는 수정하지 않음)
+#- diff: 스냅샷 그래프와 overlay 그래프 비교용 정보 (스냅샷 인덱스만 사용, 있으면 overlay에서 추가된 edge만 확인)
+class ReachabilityIndex:
+    def __init__(self, pairs: Iterable[Tuple[str, str]], diff: Optional[GraphDiff] = None):
+        self.diff = diff
+        self.pairs = frozenset(pairs)
+        self.position: Dict[str, int] = {} #node id -> node 번호 (권한 상승 edge에 등장하는 node만)
+        self.node_ids: List[str] = []
+        adjacency: List[List[int]] = []
+        for src, dst in sorted(self.pairs):
+            for node_id in (src, dst):
+                if node_id not in self.position:
+                    self.position[node_id] = len(self.node_ids)
+                    self.node_ids.append(node_id)
+                    adjacency.append([])
+            adjacency[self.position[src]].append(self.position[dst])
+
+        self.comp: List[int] = [-1] * len(self.node_ids) #node 번호 -> component 번호
+        self.members: List[List[int]] = [] #component 번호 -> node 번호 목록
+        self.reach: List[int] = [] #component 번호 -> 도달 가능한 component 비트셋 (자기 자신 포함)
+        self._tarjan(adjacency)
+
+    #반복문으로 구현한 Tarjan SCC (깊은 AssumeRole 체인에서도 재귀 한도에 걸리지 않음)
+    def _tarjan(self, adjacency: List[List[int]]) -> None:
+        node_count = len(adjacency)
+        order = [-1] * node_count
+        low = [0] * node_count
+        on_stack = bytearray(node_count)
+        stack: List[int] = []
+        counter = 0
+
+        for root in range(node_count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, 0)]
+            while work:
+                node, i = work[-1]
+                if i < len(adjacency[node]):
+                    work[-1] = (node, i + 1)
+                    neighbor = adjacency[node][i]
+                    if order[neighbor] == -1:
+                        order[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        work.append((neighbor, 0))
+                    elif on_stack[neighbor]:
+                        low[node] = min(low[node], order[neighbor])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != order[node]:
+                    continue
+
+                #node가 SCC의 루트: 스택에서 SCC를 꺼내고 도달 가능 비트셋 계산 (후속 component는 이미 완성됨)
+                c = len(self.members)
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    self.comp[member] = c
+                    members.append(member)
+                    if member == node:
+                        break
+                reach = 1 << c
+                for member in members:
+                    for neighbor in adjacency[member]:
+                        if self.comp[neighbor] != c:
+                            reach |= self.reach[self.comp[neighbor]]
+                self.members.append(members)
+                self.reach.append(reach)
+
+    @classmethod
+    def from_graph(cls, graph: Dict[str, Any], diff: Optional[GraphDiff] = None) -> "ReachabilityIndex":
+        return cls(escalation_pairs(graph), diff)
+
+    #src에서 권한 상승 edge를 따라 dst에 도달할 수 있는지 (같은 node면 True)
+    def can_reach(self, src_id: str, dst_id: str) -> bool:
+        if src_id == dst_id:
+            return True
+        src, dst = self.position.get(src_id), self.position.get(dst_id)
+        if src is None or dst is None:
+            return False
+        return bool(self.reach[self.comp[src]] >> self.comp[dst] & 1)
+
+    #시작 node들에서 도달 가능한 node id 목록 (시작 node 제외)
+    def reachable(self, start_node_ids: Iterable[str]) -> List[str]:
+        start_node_ids = list(start_node_ids)
+        bitset = 0
+        for node_id in start_node_ids:
+            pos = self.position.get(node_id)
+            if pos is not None:
+                bitset |= self.reach[self.comp[pos]]
+        starts = set(start_node_ids)
+        return sorted(
+            self.node_ids[member]
+            for c in _bits(bitset)
+            for member in self.members[c]
+            if self.node_ids[member] not in starts
+        )
+
+    #권한 상승 edge를 추가한 새 인덱스
+    #- 새 edge (u, v): u에 도달 가능한 모든 component의 비트셋에 v의 비트셋을 OR (component 수에 비례)
+    #- 새 edge가 순환을 만들면 (v에서 u에 도달 가능) SCC가 합쳐지므로 전체 재계산
+    def with_edges(self, pairs: Iterable[Tuple[str, str]]) -> "ReachabilityIndex":
+        pairs = [pair for pair in pairs if pair not in self.pairs]
+        if not pairs:
+            return self
+
+        index = object.__new__(ReachabilityIndex)
+        index.diff = None
+        index.pairs = self.pairs | frozenset(pairs)
+        index.position = dict(self.position)
+        index.node_ids = list(self.node_ids)
+        index.comp = list(self.comp)
+        index.members = list(self.members)
+        index.reach = list(self.reach)
+
+        for src, dst in pairs:
+            for node_id in (src, dst):
+                if node_id not in index.position: #새 node는 자기 자신만 도달 가능한 component로 추가
+                    c = len(index.members)
+                    index.position[node_id] = len(index.node_ids)
+                    index.node_ids.append(node_id)
+                    index.comp.append(c)
+                    index.members.append([index.position[node_id]])
+                    index.reach.append(1 << c)
+            if index.can_reach(dst, src) and src != dst:
+                return ReachabilityIndex(index.pairs)
+            src_bit = 1 << index.comp[index.position[src]]
+            dst_reach = index.reach[index.comp[index.position[dst]]]
+            for c, reach in enumerate(index.reach):
+                if reach & src_bit:
+                    index.reach[c] = reach | dst_reach
+        return index
+
+    #CLI overlay가 반영된 그래프의 인덱스 (권한 상승 edge가 추가만 되었으면 기존 인덱스를 갱신, 사라진 edge가 있으면 새로 계산)
+    #- diff가 있으면 overlay에서 바뀐 부분(GraphDelta)의 추가된 edge만 확인 (그래프 전체를 다시 훑지 않음)
+    #- 바뀐 부분을 추가분만으로 나타낼 수 없으면 (기본 그래프의 edge가 사라지거나 바뀜) 그래프 전체의 권한 상승 edge와 비교
+    def overlay(self, graph: Dict[str, Any]) -> "ReachabilityIndex":
+        delta = self.diff.delta(graph) if self.diff is not None else None
+        if delta is not None:
+            return self.with_edges(edge_pairs(delta.added_edges))
+        pairs = escalation_pairs(graph)
+        if pairs == self.pairs:
+            return self
+        if self.pairs <= pairs:
+            return self.with_edges(pairs - self.pairs)
+        return ReachabilityIndex(pairs)
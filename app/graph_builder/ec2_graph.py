@@ -1,13 +1,15 @@
 from __future__ import annotations
-from typing import Any, Dict
-import re
+from typing import Any, Dict, Optional
 
-SQS_PATTERN = r"(https://sqs\.[a-z0-9-]+\.amazonaws\.com/[^\s'\"]+)"
-RDS_PATTERN = r"[^\s'\"/]+\.([a-z0-9-]+)\.rds\.amazonaws\.com"
+from graph_builder.resource_index import build_resource_index, subnet_route_tables
+from graph_builder.reference_scanner import scan_references
 
-def graph_ec2(raw_payload: Dict[str, Any], account_id: str, region: str) -> Dict[str, Any]:
+def graph_ec2(raw_payload: Dict[str, Any], account_id: str, region: str, index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     
     instances = raw_payload.get("ec2", {}).get("instances", [])
+    #서브넷 -> 라우트 테이블, 라우트 테이블 -> IGW 기본 경로, 큐 URL/ARN, RDS 엔드포인트 인덱스 (graph_handler에서 리전당 한 번 만들어 넘겨줌)
+    if index is None:
+        index = build_resource_index(raw_payload, account_id, region)
     #Edge 생성
     edges = []
     seen_edges = set() #edge 중복 생성을 막기위한 set
@@ -20,73 +22,61 @@ def graph_ec2(raw_payload: Dict[str, Any], account_id: str, region: str) -> Dict
 
         if public_ip: #인스턴스에 public ip가 존재한다면
             instance_subnet = instance_value.get("SubnetId") #인스턴스의 서브넷을 불러오고,
-            route_tables = raw_payload.get("route_table", {}).get("RouteTables", []) #라우트 테이블 raw data도 불러와서
-            for route_table in route_tables: #라우트 테이블 목록 순회
-                associations = route_table.get("Associations", []) 
-                associated = False #Associations 내부에 subnet id가 잇는지 확인
-                for assoc in associations: #Associations 순회
-                    if assoc.get("SubnetId") == instance_subnet: #인스턴스와 일치하는 서브넷 id가 있으면
-                        associated = True #true로 변경
-                if not associated: #순회 다 했는데 False 그대로면 종료
-                    continue
-                for route in route_table.get("Routes", []): #True 값이면 해당 라우트 테이블의 Associations 내부 Routes 목록 순회하며
-                    gateway_id = route.get("GatewayId") #igw id와 
-                    destination = route.get("DestinationCidrBlock") #cidr 블록을 꺼내옴
-                    #만약 igw가 존재하고, cidr 블록이 모든 ip 대역으로 열려있으면 (public) edge 생성
-                    if gateway_id and destination == "0.0.0.0/0":
-                        igw_node_id = f"{account_id}:{region}:igw:{gateway_id}"
-                        edge_id = f"edge:{instance_id}:EC2_ACCESS_IGW:{gateway_id}"
-                        if edge_id not in seen_edges:
-                            seen_edges.add(edge_id)
-                            edges.append({
-                                "id": edge_id,
-                                "relation": "EC2_PUBLIC",
-                                "src": node_id,
-                                "dst": igw_node_id,
-                                "directed": False,
-                                "conditions": "EC2 is assigned a public IP, and the subnet where EC2 is located is connected to an IGW that can communicate externally through the route table."
-                            })
-
-        user_data = instance_value.get("UserData", "") #user data 읽어옴
-        
-        for match in re.findall(SQS_PATTERN, user_data): #sqs url이 userdata에 포함되어 있는지 확인
-            queues = raw_payload.get("sqs", {}).get("queues", []) #찾는다면 sqs raw data에서
-            for queue in queues: #queue를 모두 읽음
-                queue_url = queue.get("QueueUrl", "")
-                attributes = queue.get("Attributes", {})
-                attribure_arn = attributes.get("QueueArn")
-                name = attribure_arn.split(':')[-1]
-                if match in queue_url: #user data에 포함된 q url이랑 일치하는 url을 지녔다면
-                    edge_id = f"edge:{instance_id}:EC2_ACCESS_SQS:{name}" #edge id 미리 생성 (중복 방지)
-                    if edge_id not in seen_edges: #edgeid가 seen_edges에 포함되어있지 않으면
-                        seen_edges.add(edge_id) #해당 edge id를 seen edges에 넣고,
-                        sqs_node_id = f"{account_id}:{region}:sqs:{name}" #sqs node id를 정의된 형식에 맞게 생성하여
-                        edges.append({ #edges에 edge 추가
-                            "id": edge_id,
-                            "relation": "EC2_ACCESS_SQS",
-                            "src": node_id,
-                            "dst": sqs_node_id,
-                            "directed": True,
-                            "conditions": "The user data for the EC2 instance contains the URL of the SQS queue. You can call SQS from EC2. For more information, see Roles Associated with EC2."
-                        })
-                    
-        for match in re.findall(RDS_PATTERN, user_data): #rds endpoint가 userdata에 포함되어 있는지 확인
-            rds_instances = raw_payload.get("rds", {}).get("instances", [])  #찾는다면 rds raw data에서
-            for rds in rds_instances: #instance를 모두 읽음
-                rds_id = rds.get("DBInstanceIdentifier", "")
-                endpoint = rds.get("Endpoint", {}).get("Address", "")
-                if match in endpoint: #user data에 포함된 endpoint랑 일치하는 endpoint를 지녔다면
-                    edge_id = f"edge:{instance_id}:EC2_ACCESS_RDS:{rds_id}" #edge id 미리 생성 (중복 방지)
-                    if edge_id not in seen_edges: #edgeid가 seen_edges에 포함되어있지 않으면
-                        seen_edges.add(edge_id) #해당 edge id를 seen edges에 넣고,
-                        rds_node_id = f"{account_id}:{region}:rds:{rds_id}" #rds node id를 정의된 형식에 맞게 생성하여
-                        edges.append({ #edges에 edge 추가
+            #서브넷에 연결된 라우트 테이블 (연결된 라우트 테이블이 없으면 VPC의 메인 라우트 테이블)
+            for route_table_id in subnet_route_tables(index, instance_subnet, instance_value.get("VpcId")):
+                #해당 라우트 테이블에 igw가 존재하고, cidr 블록이 모든 ip 대역으로 열려있는 경로가 있으면 (public) edge 생성
+                for gateway_id in index["igw_routes_by_route_table"].get(route_table_id, []):
+                    igw_node_id = f"{account_id}:{region}:igw:{gateway_id}"
+                    edge_id = f"edge:{instance_id}:EC2_ACCESS_IGW:{gateway_id}"
+                    if edge_id not in seen_edges:
+                        seen_edges.add(edge_id)
+                        edges.append({
                             "id": edge_id,
-                            "relation": "EC2_ACCESS_RDS",
+                            "relation": "EC2_PUBLIC",
                             "src": node_id,
-                            "dst": rds_node_id,
+                            "dst": igw_node_id,
                             "directed": False,
-                            "conditions": "The user data for the EC2 instance contains the endpoint of the RDS. You can access RDS from EC2. For more information, see Roles Associated with EC2."
+                            "conditions": "EC2 is assigned a public IP, and the subnet where EC2 is located is connected to an IGW that can communicate externally through the route table."
                         })
+
+        user_data = instance_value.get("UserData") or "" #user data 읽어옴 (user data가 없거나 조회를 생략한 인스턴스는 None)
+        
+        references = scan_references(user_data) #user data에서 sqs url, rds endpoint, arn을 한 번에 추출
+
+        #user data에 포함된 q url(또는 큐 ARN)과 일치하는 큐를 찾아서
+        queue_targets = [index["sqs_by_url"].get(url) for url in references["sqs_url"]]
+        queue_targets += [index["sqs_by_arn"].get(arn) for arn in references["arn"]]
+        for target in queue_targets:
+            if target is None:
+                continue
+            name, sqs_node_id, _ = target
+            edge_id = f"edge:{instance_id}:EC2_ACCESS_SQS:{name}" #edge id 미리 생성 (중복 방지)
+            if edge_id not in seen_edges: #edgeid가 seen_edges에 포함되어있지 않으면
+                seen_edges.add(edge_id) #해당 edge id를 seen edges에 넣고,
+                edges.append({ #edges에 edge 추가
+                    "id": edge_id,
+                    "relation": "EC2_ACCESS_SQS",
+                    "src": node_id,
+                    "dst": sqs_node_id,
+                    "directed": True,
+                    "conditions": "The user data for the EC2 instance contains the URL of the SQS queue. You can call SQS from EC2. For more information, see Roles Associated with EC2."
+                })
+
+        for endpoint in references["rds_endpoint"]: #user data에 포함된 endpoint랑 일치하는 endpoint를 지닌 rds를 찾아서
+            target = index["rds_by_endpoint"].get(endpoint)
+            if target is None:
+                continue
+            rds_id, rds_node_id, _ = target
+            edge_id = f"edge:{instance_id}:EC2_ACCESS_RDS:{rds_id}" #edge id 미리 생성 (중복 방지)
+            if edge_id not in seen_edges: #edgeid가 seen_edges에 포함되어있지 않으면
+                seen_edges.add(edge_id) #해당 edge id를 seen edges에 넣고,
+                edges.append({ #edges에 edge 추가
+                    "id": edge_id,
+                    "relation": "EC2_ACCESS_RDS",
+                    "src": node_id,
+                    "dst": rds_node_id,
+                    "directed": False,
+                    "conditions": "The user data for the EC2 instance contains the endpoint of the RDS. You can access RDS from EC2. For more information, see Roles Associated with EC2."
+                })
                         
     return edges
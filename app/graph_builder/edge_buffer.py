@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from array import array
+
+#graph builder가 만드는 edge를 dict 대신 열(column) 단위 정수 배열로 모아두는 버퍼
+#- 문자열(node id, 이름, relation, conditions)은 한 번만 등록하고 번호로 저장 (src, dst, relation, src_label, dst_label, conditions 배열)
+#- edge id("edge:{src_label}:{relation}:{dst_label}")가 같은 edge는 번호로 중복 제거 (기존 seen_edges와 같은 기준, edge id 문자열은 만들지 않음)
+#- Resource "*" 펼치기(add_fanout)는 대상 목록을 종류별로 한 번만 번호로 바꿔두고, 대상마다 dict와 f-string을 만들지 않고 배열에 추가
+#- dict edge는 builder가 끝날 때 to_dicts에서 한 번에 생성 (graph builder의 반환 형식은 그대로 dict 목록)
+class EdgeBuffer:
+    def __init__(self, directed: bool = True):
+        self.directed = directed
+        self.values: List[Any] = [] #번호 -> 문자열
+        self._codes: Dict[Any, int] = {} #문자열 -> 번호
+        self.src = array("l")
+        self.dst = array("l")
+        self.relation = array("l")
+        self.src_label = array("l")
+        self.dst_label = array("l")
+        self.conditions = array("l")
+        self._seen: Dict[int, set] = {} #(src_label, relation) 번호를 합친 정수 키 -> 이미 추가한 dst_label 번호
+        self._targets: Dict[str, tuple] = {} #종류 -> (이름 번호 배열, node id 번호 배열, ARN 목록, 이름 번호 집합)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    #문자열의 번호 (처음 보는 문자열이면 등록)
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    #src_label, relation이 같은 edge들은 dst_label 번호만으로 중복 여부를 판단
+    @staticmethod
+    def _prefix(src_label: int, relation: int) -> int:
+        return (src_label << 32) | relation
+
+    #edge 하나 추가 (edge id가 같은 edge가 이미 있으면 무시)
+    def add(self, src_label: str, relation: str, dst_label: str, src: str, dst: str, conditions: str) -> None:
+        sl, rel, dl = self.code(src_label), self.code(relation), self.code(dst_label)
+        seen = self._seen.setdefault(self._prefix(sl, rel), set())
+        if dl in seen:
+            return
+        seen.add(dl)
+        self.src.append(self.code(src))
+        self.dst.append(self.code(dst))
+        self.relation.append(rel)
+        self.src_label.append(sl)
+        self.dst_label.append(dl)
+        self.conditions.append(self.code(conditions))
+
+    #src에서 대상 목록(resource_index의 (이름, node id, ARN) 목록)의 node들로 같은 relation의 edge를 한 번에 추가
+    #- exclude: 제외할 대상 이름 (자기 자신 등)
+    #- match: ARN을 받아 연결 여부를 반환하는 함수 (None이면 모든 대상)
+    #- 같은 src_label, relation으로 추가된 edge가 없고 대상 이름이 모두 다르면 (Resource "*"의 첫 펼치기) 중복 검사 없이 배열 단위로 추가
+    def add_fanout(self, src_label: str, relation: str, src: str, conditions: str, kind: str, targets: Sequence[Tuple[str, str, str]],
+                   exclude: Optional[str] = None, match: Optional[Callable[[str], bool]] = None) -> None:
+        columns = self._targets.get(kind)
+        if columns is None:
+            labels = array("l", [self.code(t[0]) for t in targets])
+            columns = self._targets[kind] = (labels, array("l", [self.code(t[1]) for t in targets]), [t[2] for t in targets], set(labels))
+        labels, nodes, arns, label_set = columns
+
+        sl, rel = self.code(src_label), self.code(relation)
+        prefix = self._prefix(sl, rel)
+        skip = self._codes.get(exclude, -1) if exclude is not None else -1
+        seen = self._seen.get(prefix)
+
+        if match is None and not seen and len(label_set) == len(labels):
+            if skip not in label_set: #대상 전체
+                picked_labels, picked_nodes = labels, nodes
+            else:
+                picked = [i for i, dl in enumerate(labels) if dl != skip]
+                picked_labels = array("l", [labels[i] for i in picked])
+                picked_nodes = array("l", [nodes[i] for i in picked])
+            self._seen[prefix] = set(picked_labels)
+        else:
+            seen = self._seen.setdefault(prefix, set())
+            picked = []
+            for i, dl in enumerate(labels):
+                if dl == skip or dl in seen or (match is not None and not match(arns[i])):
+                    continue
+                seen.add(dl)
+                picked.append(i)
+            picked_labels = array("l", [labels[i] for i in picked])
+            picked_nodes = array("l", [nodes[i] for i in picked])
+
+        count = len(picked_labels)
+        self.src.extend(array("l", [self.code(src)]) * count)
+        self.dst.extend(picked_nodes)
+        self.relation.extend(array("l", [rel]) * count)
+        self.src_label.extend(array("l", [sl]) * count)
+        self.dst_label.extend(picked_labels)
+        self.conditions.extend(array("l", [self.code(conditions)]) * count)
+
+    #graph builder의 edge 형식(dict 목록)으로 변환 (추가한 순서 유지)
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        values, directed = self.values, self.directed
+        return [
+            {
+                "id": f"edge:{values[sl]}:{values[rel]}:{values[dl]}",
+                "relation": values[rel],
+                "src": values[src],
+                "dst": values[dst],
+                "directed": directed,
+                "conditions": values[cond],
+            }
+            for src, dst, rel, sl, dl, cond in zip(self.src, self.dst, self.relation, self.src_label, self.dst_label, self.conditions)
+        ]
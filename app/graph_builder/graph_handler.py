@@ -7,6 +7,8 @@ from graph_builder.ec2_graph import graph_ec2
 from graph_builder.lambda_graph import graph_lambda
 from graph_builder.iam_user_graph import graph_user
 from graph_builder.iam_role_graph import graph_role
+from graph_builder.resource_index import build_resource_index
+from graph_builder.policy_engine import PolicyCompiler
 # from graph_builder.igw_graph import transform_igw_to_graph
 # from graph_builder.rds_graph import transform_rds_to_graph
 # from graph_builder.route_table_graph import transform_route_table_to_graph
@@ -19,10 +21,66 @@ def run_graph_builder(collected: Dict[str, Any], normalized_map: Dict[str, Any])
     region = collected["region"]
     collected_at = collected["collected_at"]
 
-    normalized_map.setdefault("edges", [])
-    normalized_map["edges"].extend(graph_ec2(collected, account_id, region))
-    normalized_map["edges"].extend(graph_lambda(collected, account_id, region))
-    normalized_map["edges"].extend(graph_user(collected, account_id, region))
-    normalized_map["edges"].extend(graph_role(collected, account_id, region))
+    #normalized_map은 수정하지 않고 edge가 추가된 새 그래프를 반환 (캐시된 스냅샷을 여러 CLI 평가에서 공유할 수 있도록)
+    edges = list(normalized_map.get("edges", []))
+    index = build_resource_index(collected, account_id, region, PolicyCompiler()) #graph builder들이 같이 사용하는 리소스 인덱스 (한 번만 생성, 정책 컴파일 캐시는 이번 생성 동안만 사용)
+    edges.extend(graph_ec2(collected, account_id, region, index))
+    edges.extend(graph_lambda(collected, account_id, region, index))
+    edges.extend(graph_user(collected, account_id, region, index))
+    edges.extend(graph_role(collected, account_id, region, index))
 
-    return normalized_map
\ No newline at end of file
+    return {**normalized_map, "edges": edges}
+
+#여러 리전의 수집 결과(handler_multi_region 반환값)와 병합된 정규화 그래프로 edge 생성
+#- 리전마다 해당 리전의 raw data로 edge를 만들고 하나로 합침
+#- IAM 간 edge처럼 모든 리전에서 똑같이 만들어지는 edge는 한 번만 추가
+#- 다른 리전의 같은 이름 리소스 때문에 edge id가 겹치면 id 뒤에 리전을 붙여 구분
+def run_graph_builder_multi_region(collected: Dict[str, Any], normalized_map: Dict[str, Any]) -> Dict[str, Any]:
+    edges = list(normalized_map.get("edges", []))
+    seen = {(e["id"], e["src"], e["dst"]) for e in edges}
+    used_ids = {e["id"] for e in edges}
+    policies = PolicyCompiler() #리전들이 같은 IAM 정책을 공유하므로 컴파일 결과도 공유
+
+    for region, region_collected in collected["regions"].items():
+        account_id = region_collected["account_id"]
+        _merge_edges(edges, _region_edges(region_collected, account_id, region, policies), seen, used_ids, region)
+
+    return {**normalized_map, "edges": edges}
+
+#여러 계정의 수집 결과(handler_multi_account 반환값)와 병합된 정규화 그래프로 edge 생성
+#- 계정(및 리전)마다 해당 raw data로 edge를 만들고 하나로 합침
+#- 다른 계정의 같은 이름 리소스 때문에 edge id가 겹치면 id 뒤에 계정 id와 리전을 붙여 구분
+def run_graph_builder_multi_account(collected: Dict[str, Any], normalized_map: Dict[str, Any]) -> Dict[str, Any]:
+    edges = list(normalized_map.get("edges", []))
+    seen = {(e["id"], e["src"], e["dst"]) for e in edges}
+    used_ids = {e["id"] for e in edges}
+    policies = PolicyCompiler()
+
+    for account_id, account_collected in collected["accounts"].items():
+        region_results = account_collected.get("regions") or {account_collected["region"]: account_collected}
+        for region, region_collected in region_results.items():
+            _merge_edges(edges, _region_edges(region_collected, account_id, region, policies), seen, used_ids, f"{account_id}:{region}")
+
+    return {**normalized_map, "edges": edges}
+
+#리전 하나의 raw data로 만들어지는 edge 목록
+def _region_edges(collected: Dict[str, Any], account_id: str, region: str, policies: Optional[PolicyCompiler] = None) -> List[Dict[str, Any]]:
+    index = build_resource_index(collected, account_id, region, policies)
+    return (
+        graph_ec2(collected, account_id, region, index) +
+        graph_lambda(collected, account_id, region, index) +
+        graph_user(collected, account_id, region, index) +
+        graph_role(collected, account_id, region, index)
+    )
+
+#새 edge들을 기존 edge 목록에 추가 (src, dst까지 같은 edge는 생략하고, id만 겹치면 suffix를 붙임)
+def _merge_edges(edges: List[Dict[str, Any]], new_edges: List[Dict[str, Any]], seen: set, used_ids: set, suffix: str) -> None:
+    for edge in new_edges:
+        key = (edge["id"], edge["src"], edge["dst"])
+        if key in seen:
+            continue
+        seen.add(key)
+        if edge["id"] in used_ids:
+            edge["id"] = f"{edge['id']}:{suffix}"
+        used_ids.add(edge["id"])
+        edges.append(edge)
\ No newline at end of file
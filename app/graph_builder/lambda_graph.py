@@ -1,11 +1,10 @@
 from __future__ import annotations
-from typing import Any, Dict, List
-import re
+from typing import Any, Dict, List, Optional
 
-#EC2 IP가 존재하는지 확인하기 위해 ip 패턴 정의
-IP_PATTERN = r"\b\d{1,3}(?:\.\d{1,3}){3}\b"
+from graph_builder.resource_index import build_resource_index
+from graph_builder.reference_scanner import scan_references
 
-def graph_lambda(raw_payload: Dict[str, Any], account_id: str, region: str) -> Dict[str, Any]:
+def graph_lambda(raw_payload: Dict[str, Any], account_id: str, region: str, index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     # Lambda 설정/환경변수/EventSourceMapping 기반으로 관계(edge) 생성
     functions = raw_payload.get("lambda", {}).get("functions", [])
     edges = []
@@ -31,7 +30,9 @@ def graph_lambda(raw_payload: Dict[str, Any], account_id: str, region: str) -> D
             "conditions": conditions,
         })
     
-    ec2_instances = raw_payload.get("ec2", {}).get("instances", []) #raw data의 EC2 목록 불러오기 -> Lambda 환경 변수에 EC2 Ip 존재 여부 확인용
+    #EC2 ip -> 인스턴스 인덱스 (Lambda 환경 변수에 EC2 Ip 존재 여부 확인용, graph_handler에서 리전당 한 번 만들어 넘겨줌)
+    if index is None:
+        index = build_resource_index(raw_payload, account_id, region)
 
     for function_value in functions: #Lambda 함수 순회
         node_type = "lambda"
@@ -47,23 +48,18 @@ def graph_lambda(raw_payload: Dict[str, Any], account_id: str, region: str) -> D
             _add_edge(edge_id, "LAMBDA_ASSUME_ROLE", node_id, dst_role_id, "This Lambda function is configured to assume the specified IAM Role.")
 
         env_vars = function_value.get("Environment", {}).get("Variables", {}) #Lambda 환경 변수 불러오기
-        env_text = " ".join(env_vars.values()) #한 줄의 문자열로 만들어서 re.findall로 매칭 할 수 있는 형태로 만들기
-        found_ips = re.findall(IP_PATTERN, env_text) #IP 형태의 변수가 존재하는지 확인
-        for instance in ec2_instances: #인스턴스 목록 순회
-            instance_id = instance.get("InstanceId")
-            private_ip = instance.get("PrivateIpAddress")
-            public_ip = instance.get("PublicIpAddress")
-            ec2_node_id = f"{account_id}:{region}:ec2:{instance_id}"
-            for ip in found_ips: #변수에서 발견한 IP를 순회
-                if ip == private_ip or ip == public_ip: #해당 IP가 EC2의 private 또는 public ip와 일치한다면
-                    edge_id = f"edge:{name}:LAMBDA_CALL_EC2:{instance_id}"
-                    _add_edge(
-                        edge_id,
-                        "LAMBDA_CALL_EC2",
-                        node_id,
-                        ec2_node_id,
-                        "This Lambda function's environment variables contain an EC2 public or private IP address. EC2 is accessible. For more information, check the role associated with the Lambda function."
-                    )
+        env_text = " ".join(env_vars.values()) #한 줄의 문자열로 만들어서 scan_references로 한 번에 스캔할 수 있는 형태로 만들기
+        found_ips = scan_references(env_text)["ip"] #IP 형태의 변수가 존재하는지 확인
+        for ip in found_ips: #변수에서 발견한 IP를 순회
+            for instance_id, ec2_node_id, _ in index["ec2_by_ip"].get(ip, []): #해당 IP가 EC2의 private 또는 public ip와 일치한다면
+                edge_id = f"edge:{name}:LAMBDA_CALL_EC2:{instance_id}"
+                _add_edge(
+                    edge_id,
+                    "LAMBDA_CALL_EC2",
+                    node_id,
+                    ec2_node_id,
+                    "This Lambda function's environment variables contain an EC2 public or private IP address. EC2 is accessible. For more information, check the role associated with the Lambda function."
+                )
                         
                         
         mappings = function_value.get("EventSourceMappings", []) #Event Source Mapping 안의 내용을 불러와서
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import re
+
+#IAM 정책 Statement를 한 번만 해석해서 Action/Resource 매칭이 가능한 형태로 컴파일
+#- Action, NotAction: IAM과 같이 대소문자 구분 없이 비교 (iam:*, lambda:Update* 등 와일드카드 지원)
+#- Resource, NotResource: ARN 패턴 비교 (* 는 임의의 문자열, ? 는 임의의 한 글자)
+#- 와일드카드가 없는 Action, Resource는 문자열 비교만 하고, 와일드카드 패턴만 처음 비교할 때 정규식으로 변환
+#- 컴파일 결과는 PolicyCompiler(그래프 한 번 생성 동안 사용)에 저장하여 같은 정책은 한 번만 컴파일
+
+#Lambda 코드/설정 변경으로 privesc가 가능한 Action (graph_user, graph_role의 *_CAN_MODIFY_LAMBDA)
+LAMBDA_MODIFY_ACTIONS = ["lambda:UpdateFunctionCode", "lambda:UpdateFunctionConfiguration", "lambda:CreateFunction", "lambda:AddPermission"]
+
+#정책 패턴 하나를 정규식으로 변환 (IAM 패턴에는 *, ? 외의 특수문자가 없으므로 나머지는 그대로 비교)
+def _compile_pattern(pattern: str, ignore_case: bool):
+    regex = "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern)
+    return re.compile(regex + r"\Z", re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+
+def has_wildcard(pattern: str) -> bool:
+    return "*" in pattern or "?" in pattern
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, str) for v in value): #수집 결과의 목록을 그대로 사용 (수정하지 않음)
+        return value
+    return [v for v in value if isinstance(v, str)]
+
+#Action(또는 NotAction) 패턴 목록의 매칭 규칙
+#같은 Action 목록을 쓰는 Statement가 많으므로 PolicyCompiler에서 (패턴 목록, NotAction 여부) 기준으로 공유
+class ActionPatterns:
+    __slots__ = ("negated", "patterns", "_literals", "_wildcards", "_matchers", "_results", "_services", "_compiler")
+
+    def __init__(self, patterns: tuple, negated: bool, compiler: "PolicyCompiler"):
+        self.negated = negated
+        self.patterns = patterns
+        self._literals = {p.lower() for p in patterns if not has_wildcard(p)}
+        self._wildcards = [p for p in patterns if has_wildcard(p)]
+        self._matchers = None #와일드카드 패턴의 정규식 (처음 비교할 때 생성)
+        self._results: Dict[str, bool] = {} #action -> allows_action 결과
+        self._services: Dict[str, bool] = {} #서비스 -> allows_service 결과
+        self._compiler = compiler
+
+    def allows_action(self, action: str) -> bool:
+        allowed = self._results.get(action)
+        if allowed is None:
+            matched = action.lower() in self._literals
+            if not matched and self._wildcards:
+                if self._matchers is None:
+                    self._matchers = [self._compiler.matcher(p, True) for p in self._wildcards]
+                matched = any(m.match(action) for m in self._matchers)
+            allowed = self._results[action] = not matched if self.negated else matched
+        return allowed
+
+    #- Action: 패턴의 서비스 부분이 service와 매칭되면 허용 (iam:PassRole, iam:*, * 등)
+    #- NotAction: 서비스 전체를 제외하는 패턴(iam:*, i*:*, *)이 없으면 허용
+    def allows_service(self, service: str) -> bool:
+        allowed = self._services.get(service)
+        if allowed is None:
+            if self.negated:
+                parts = [p.partition(":")[0] if p != "*" else "*" for p in self.patterns if p == "*" or p.partition(":")[2] == "*"]
+            else:
+                parts = [p.split(":", 1)[0] for p in self.patterns]
+            matched = any(
+                self._compiler.matcher(part, True).match(service) if has_wildcard(part) else part.lower() == service.lower()
+                for part in parts
+            )
+            allowed = self._services[service] = not matched if self.negated else matched
+        return allowed
+
+class CompiledStatement:
+    __slots__ = (
+        "effect", "actions", "not_actions", "resources", "not_resources", "uses_not_action", "uses_not_resource",
+        "all_resources", "literal_resources", "has_resource_patterns", "_actions", "_resource_wildcards", "_resource_matchers", "_compiler",
+    )
+
+    def __init__(self, stmt: Dict[str, Any], compiler: Optional["PolicyCompiler"] = None):
+        self._compiler = compiler if compiler is not None else PolicyCompiler()
+        self.effect = stmt.get("Effect")
+        self.actions = _as_list(stmt.get("Action"))
+        self.not_actions = _as_list(stmt.get("NotAction"))
+        self.resources = _as_list(stmt.get("Resource"))
+        self.not_resources = _as_list(stmt.get("NotResource"))
+        self.uses_not_action = "NotAction" in stmt
+        self.uses_not_resource = "NotResource" in stmt
+
+        self._actions = self._compiler.actions(self.not_actions if self.uses_not_action else self.actions, self.uses_not_action)
+        resource_patterns = self.not_resources if self.uses_not_resource else self.resources
+        self._resource_wildcards = [r for r in resource_patterns if has_wildcard(r)]
+        self._resource_matchers = None #와일드카드 패턴의 정규식 (처음 비교할 때 생성)
+
+        #Resource가 * 를 포함하면 모든 리소스 대상
+        self.all_resources = not self.uses_not_resource and "*" in self.resources
+        #와일드카드가 없는 Resource (ARN에서 리소스 이름을 바로 추출할 수 있는 경우)
+        if self.uses_not_resource:
+            self.literal_resources = []
+        elif self._resource_wildcards:
+            self.literal_resources = [r for r in self.resources if not has_wildcard(r)]
+        else:
+            self.literal_resources = self.resources
+        #수집된 리소스의 ARN과 비교해야 하는 경우 (ARN 패턴 또는 NotResource)
+        self.has_resource_patterns = self.uses_not_resource or bool(self._resource_wildcards)
+
+    #action(서비스:API)이 이 Statement로 허용되는지
+    def allows_action(self, action: str) -> bool:
+        return self._actions.allows_action(action)
+
+    #해당 서비스의 action이 하나라도 허용되는지 (서비스 단위 접근 edge 판단용)
+    def allows_service(self, service: str) -> bool:
+        return self._actions.allows_service(service)
+
+    #리소스 ARN이 이 Statement의 Resource(또는 NotResource) 조건에 해당하는지 (와일드카드 없는 ARN은 문자열 비교)
+    def matches_resource(self, arn: str) -> bool:
+        patterns = self.not_resources if self.uses_not_resource else self.resources
+        matched = arn in patterns
+        if not matched and self._resource_wildcards:
+            if self._resource_matchers is None:
+                self._resource_matchers = [self._compiler.matcher(p, False) for p in self._resource_wildcards]
+            matched = any(m.match(arn) for m in self._resource_matchers)
+        return not matched if self.uses_not_resource else matched
+
+#그래프 한 번 생성하는 동안 사용하는 정책 컴파일 캐시 (graph_handler에서 생성하여 resource_index로 전달)
+#- 정규식: (패턴, 대소문자 무시 여부) 기준
+#- Action 패턴: (Action 목록, NotAction 여부) 기준
+#- Statement: Statement 객체 기준 (수집 결과의 같은 객체는 한 번만 컴파일)
+#- 정책 문서: 관리형 정책 버전이면 (PolicyArn, VersionId), 아니면 문서 객체 기준 (내용 해시는 계산하지 않음)
+#- 벡터 추출용 Statement 요약: (문서 키, 출력 필드, 기본값) 기준 (filters.iam_user, filters.iam_role이 run_filtering 한 번 동안 공유)
+#생성이 끝나면 버려지므로 계정 크기와 관계없이 제거(eviction) 없이 사용
+class PolicyCompiler:
+    def __init__(self):
+        self._matchers: Dict[tuple, Any] = {}
+        self._actions: Dict[tuple, ActionPatterns] = {}
+        self._statements: Dict[int, tuple] = {} #id(Statement) -> (Statement, 컴파일 결과), 객체를 함께 보관하여 id 재사용 방지
+        self._policies: Dict[Any, tuple] = {} #문서 키 -> (문서, 컴파일 결과 목록)
+        self._summaries: Dict[tuple, tuple] = {} #(문서 키, 필드, 기본값) -> (문서, Statement 요약 목록)
+
+    def matcher(self, pattern: str, ignore_case: bool):
+        key = (pattern, ignore_case)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = self._matchers[key] = _compile_pattern(pattern, ignore_case)
+        return matcher
+
+    def actions(self, patterns: List[str], negated: bool) -> ActionPatterns:
+        key = (tuple(patterns), negated)
+        actions = self._actions.get(key)
+        if actions is None:
+            actions = self._actions[key] = ActionPatterns(key[0], negated, self)
+        return actions
+
+    def statement(self, stmt: Dict[str, Any]) -> CompiledStatement:
+        entry = self._statements.get(id(stmt))
+        if entry is None:
+            entry = self._statements[id(stmt)] = (stmt, CompiledStatement(stmt, self))
+        return entry[1]
+
+    #정책 문서의 Statement들을 컴파일 (Statement가 객체 하나인 문서도 처리)
+    #key: 관리형 정책 버전의 (PolicyArn, VersionId) (여러 principal에 복사된 같은 버전의 문서를 한 번만 컴파일)
+    def policy(self, doc: Dict[str, Any], key: Optional[tuple] = None) -> List[CompiledStatement]:
+        key = key if key is not None else id(doc)
+        entry = self._policies.get(key)
+        if entry is None:
+            entry = self._policies[key] = (doc, [self.statement(stmt) for stmt in policy_statements(doc)])
+        return entry[1]
+
+    #정책 문서의 벡터 추출용 Statement 요약 (vector_statements 결과, 여러 principal이 같은 목록을 공유하므로 수정하지 않음)
+    #key: policy()와 같은 관리형 정책 버전의 (PolicyArn, VersionId)
+    def summary(self, doc: Any, fields: tuple = ("Effect", "Action", "Resource"), defaults: Optional[Dict[str, Any]] = None,
+                key: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        cache_key = (key if key is not None else id(doc), fields, repr(defaults) if defaults else None)
+        entry = self._summaries.get(cache_key)
+        if entry is None:
+            entry = self._summaries[cache_key] = (doc, vector_statements(doc, fields, defaults))
+        return entry[1]
+
+#관리형 정책 버전의 컴파일 캐시 키 (PolicyArn, VersionId가 없으면 None -> 문서 객체 기준)
+def version_key(policy: Dict[str, Any], version: Dict[str, Any]) -> Optional[tuple]:
+    policy_arn, version_id = policy.get("PolicyArn"), version.get("VersionId")
+    return (policy_arn, version_id) if policy_arn and version_id else None
+
+#정책 문서의 Statement 목록 (Statement가 객체 하나인 문서도 목록으로 통일)
+def policy_statements(doc: Any) -> List[Dict[str, Any]]:
+    statements = doc.get("Statement", []) if isinstance(doc, dict) else []
+    if isinstance(statements, dict):
+        statements = [statements]
+    return [stmt for stmt in statements if isinstance(stmt, dict)]
+
+#Statement 하나를 컴파일
+def compile_statement(stmt: Dict[str, Any], compiler: Optional[PolicyCompiler] = None) -> CompiledStatement:
+    return (compiler if compiler is not None else PolicyCompiler()).statement(stmt)
+
+#벡터 추출용 Statement 요약 (filters.iam_user, filters.iam_role)
+#- fields: 출력할 Statement 필드 (출력 순서 유지)
+#- defaults: Statement에 없는 필드의 기본값 (없으면 None)
+def vector_statements(doc: Any, fields: tuple = ("Effect", "Action", "Resource"), defaults: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    defaults = defaults or {}
+    return [{field: stmt.get(field, defaults.get(field)) for field in fields} for stmt in policy_statements(doc)]
+
+#정책 문서의 Statement들을 컴파일 (compiler가 없으면 이 문서만 컴파일)
+def compile_policy(doc: Dict[str, Any], compiler: Optional[PolicyCompiler] = None, key: Optional[tuple] = None) -> List[CompiledStatement]:
+    return (compiler if compiler is not None else PolicyCompiler()).policy(doc, key)
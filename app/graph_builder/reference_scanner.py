@@ -0,0 +1,36 @@
+from __future__ import annotations
+from typing import Dict, List
+import re
+
+#EC2 user data, Lambda 환경변수 같은 텍스트에서 다른 리소스를 가리키는 참조를 한 번의 스캔으로 추출
+#- sqs_url: SQS 큐 URL (https://sqs.리전.amazonaws.com/계정/큐이름)
+#- rds_endpoint: RDS 엔드포인트 호스트 (DB식별자.xxxx.리전.rds.amazonaws.com)
+#- arn: ARN (arn:aws:서비스:리전:계정:리소스)
+#- ip: IPv4 주소
+#추출한 값은 resource_index의 해시 인덱스(sqs_by_url, rds_by_endpoint, ec2_by_ip, sqs_by_arn)로 바로 조회 (리소스 목록을 다시 순회하지 않음)
+REFERENCE_PATTERN = re.compile(
+    r"(?P<sqs_url>https://sqs\.[a-z0-9-]+\.amazonaws\.com/[^\s'\"]+)"
+    r"|(?<![A-Za-z0-9.-])(?P<rds_endpoint>[A-Za-z0-9.-]+\.rds\.amazonaws\.com)"
+    r"|(?P<arn>arn:aws[a-z-]*:[^\s'\"]+)"
+    r"|(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}\b)"
+)
+
+#URL, ARN 뒤에 붙은 문장부호는 참조의 일부가 아님 (예: "...queue1)," 또는 "...queue1.")
+_TRAILING = ".,;)]}/"
+
+#텍스트에서 참조 종류별로 추출 (종류별로 처음 나온 순서대로, 중복 제거)
+def scan_references(text: str) -> Dict[str, List[str]]:
+    found: Dict[str, Dict[str, None]] = {"sqs_url": {}, "rds_endpoint": {}, "arn": {}, "ip": {}}
+    if not text:
+        return {kind: [] for kind in found}
+
+    for match in REFERENCE_PATTERN.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ("sqs_url", "arn"):
+            value = value.rstrip(_TRAILING)
+        elif kind == "rds_endpoint":
+            value = value.lower() #호스트 이름은 대소문자 구분 없음
+        found[kind][value] = None
+
+    return {kind: list(values) for kind, values in found.items()}
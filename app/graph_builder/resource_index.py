@@ -0,0 +1,137 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from graph_builder.policy_engine import PolicyCompiler
+
+#graph builder들(graph_ec2, graph_lambda, graph_user, graph_role)이 같이 사용하는 리소스 조회용 인덱스
+#- 서비스별 (리소스 이름, node id, ARN) 목록: Resource가 * 인 정책은 이 목록을 그대로 돌면서 edge만 추가 (raw data를 매번 다시 순회하지 않음)
+#  ARN은 Resource가 ARN 패턴(arn:aws:iam::*:role/app-* 등)인 정책과 비교할 때 사용 (raw data에 ARN이 없으면 형식에 맞게 생성)
+#- policies: 정책 컴파일 캐시 (graph_user, graph_role)
+#- rds_by_dbname: 정책 Resource의 DB name -> 해당 DBName을 가진 RDS 인스턴스들
+#- sqs_by_name, sqs_by_url, sqs_by_arn: 큐 이름, 큐 URL, 큐 ARN -> 큐
+#- rds_by_endpoint: 엔드포인트 호스트(소문자) -> RDS 인스턴스, ec2_by_ip: private/public ip -> EC2 인스턴스들 (reference_scanner로 찾은 참조 조회용)
+#- route_tables_by_subnet, main_route_table_by_vpc, igw_routes_by_route_table: 서브넷의 라우트 테이블과 IGW 기본 경로 (build_route_index)
+#raw data 하나(리전 하나)당 한 번만 만들어서 builder들에 넘겨줌
+def build_resource_index(raw_payload: Dict[str, Any], account_id: str, region: str, policies: Optional[PolicyCompiler] = None) -> Dict[str, Any]:
+    def _targets(items: List[Dict[str, Any]], node_type: str, get_name, get_arn) -> List[Tuple[str, str, str]]:
+        targets = []
+        for item in items:
+            target_name = get_name(item)
+            targets.append((target_name, f"{account_id}:{region}:{node_type}:{target_name}", get_arn(item, target_name)))
+        return targets
+
+    queues = raw_payload.get("sqs", {}).get("queues", [])
+    rds_instances = raw_payload.get("rds", {}).get("instances", [])
+    ec2_instances = raw_payload.get("ec2", {}).get("instances", [])
+
+    index = {
+        "sqs": _targets(
+            queues, "sqs",
+            lambda q: q["Attributes"]["QueueArn"].split(":")[-1],
+            lambda q, _: q["Attributes"]["QueueArn"]
+        ),
+        "ec2": _targets(
+            ec2_instances, "ec2",
+            lambda inst: inst["InstanceId"],
+            lambda inst, iid: f"arn:aws:ec2:{region}:{account_id}:instance/{iid}"
+        ),
+        "rds": _targets(
+            rds_instances, "rds",
+            lambda inst: inst["DBInstanceIdentifier"],
+            lambda inst, iid: inst.get("DBInstanceArn") or f"arn:aws:rds:{region}:{account_id}:db:{iid}"
+        ),
+        "lambda": _targets(
+            raw_payload.get("lambda", {}).get("functions", []), "lambda",
+            lambda func: func["FunctionName"],
+            lambda func, fname: func.get("FunctionArn") or f"arn:aws:lambda:{region}:{account_id}:function:{fname}"
+        ),
+        "secretsmanager": _targets(
+            raw_payload.get("secretsmanager", {}).get("secrets", []), "secretsmanager",
+            lambda sec: sec["Name"],
+            lambda sec, secret_name: sec.get("ARN") or f"arn:aws:secretsmanager:{region}:{account_id}:secret:{secret_name}"
+        ),
+        #IAM은 리전이 없는 node id 사용
+        "iam_role": [
+            (role["RoleName"], f"{account_id}:iam_role:{role['RoleName']}", role.get("Arn") or f"arn:aws:iam::{account_id}:role/{role['RoleName']}")
+            for role in raw_payload.get("iam_role", {}).get("roles", [])
+        ],
+        "iam_user": [
+            (user["UserName"], f"{account_id}:iam_user:{user['UserName']}", user.get("Arn") or f"arn:aws:iam::{account_id}:user/{user['UserName']}")
+            for user in raw_payload.get("iam_user", {}).get("users", [])
+        ],
+        "rds_by_dbname": {},
+        "rds_by_endpoint": {},
+        "ec2_by_ip": {},
+        "sqs_by_name": {},
+        "sqs_by_url": {},
+        "sqs_by_arn": {},
+        "policies": policies if policies is not None else PolicyCompiler(), #정책 컴파일 캐시 (그래프 한 번 생성 동안 여러 리전이 공유)
+    }
+
+    for inst, target in zip(rds_instances, index["rds"]):
+        db_name = inst.get("DBName")
+        if db_name: #DBName이 없는 인스턴스는 정책 Resource(:db/이름)로 찾을 수 없음
+            index["rds_by_dbname"].setdefault(db_name, []).append(target)
+        address = (inst.get("Endpoint") or {}).get("Address")
+        if address:
+            index["rds_by_endpoint"][address.lower()] = target
+
+    for inst, target in zip(ec2_instances, index["ec2"]):
+        for ip in (inst.get("PrivateIpAddress"), inst.get("PublicIpAddress")):
+            if ip and target not in index["ec2_by_ip"].get(ip, []):
+                index["ec2_by_ip"].setdefault(ip, []).append(target)
+
+    for queue, target in zip(queues, index["sqs"]):
+        index["sqs_by_name"][target[0]] = target
+        index["sqs_by_arn"][target[2]] = target
+        if queue.get("QueueUrl"):
+            index["sqs_by_url"][queue["QueueUrl"]] = target
+
+    index.update(build_route_index(raw_payload))
+    return index
+
+#라우트 테이블 raw data로 서브넷 -> 라우트 테이블, 라우트 테이블 -> IGW 기본 경로 인덱스 생성
+#- route_tables_by_subnet: 서브넷 id -> 명시적으로 연결(Association)된 라우트 테이블 id 목록
+#- main_route_table_by_vpc: VPC id -> 메인 라우트 테이블 id (명시적으로 연결된 라우트 테이블이 없는 서브넷은 메인 라우트 테이블을 사용)
+#- subnet_vpc: 서브넷 id -> VPC id (인스턴스에 VpcId가 없는 경우 메인 라우트 테이블을 찾기 위해 사용)
+#- igw_routes_by_route_table: 라우트 테이블 id -> 0.0.0.0/0 경로의 게이트웨이 id 목록
+def build_route_index(raw_payload: Dict[str, Any]) -> Dict[str, Any]:
+    route_tables_by_subnet: Dict[str, List[str]] = {}
+    main_route_table_by_vpc: Dict[str, str] = {}
+    igw_routes_by_route_table: Dict[str, List[str]] = {}
+
+    for route_table in raw_payload.get("route_table", {}).get("RouteTables", []):
+        route_table_id = route_table.get("RouteTableId")
+        for assoc in route_table.get("Associations", []):
+            if assoc.get("SubnetId"):
+                route_tables_by_subnet.setdefault(assoc["SubnetId"], []).append(route_table_id)
+            if assoc.get("Main") and route_table.get("VpcId"):
+                main_route_table_by_vpc[route_table["VpcId"]] = route_table_id
+
+        gateways = []
+        for route in route_table.get("Routes", []):
+            gateway_id = route.get("GatewayId")
+            if gateway_id and route.get("DestinationCidrBlock") == "0.0.0.0/0" and gateway_id not in gateways:
+                gateways.append(gateway_id)
+        igw_routes_by_route_table[route_table_id] = gateways
+
+    subnet_vpc = {
+        subnet["SubnetId"]: subnet.get("VpcId")
+        for subnet in raw_payload.get("subnet", {}).get("Subnets", [])
+        if subnet.get("SubnetId")
+    }
+
+    return {
+        "route_tables_by_subnet": route_tables_by_subnet,
+        "main_route_table_by_vpc": main_route_table_by_vpc,
+        "subnet_vpc": subnet_vpc,
+        "igw_routes_by_route_table": igw_routes_by_route_table,
+    }
+
+#서브넷이 사용하는 라우트 테이블 id 목록 (명시적으로 연결된 라우트 테이블이 없으면 VPC의 메인 라우트 테이블)
+def subnet_route_tables(index: Dict[str, Any], subnet_id: str, vpc_id: Optional[str] = None) -> List[str]:
+    route_tables = index["route_tables_by_subnet"].get(subnet_id)
+    if route_tables:
+        return route_tables
+    main_route_table = index["main_route_table_by_vpc"].get(vpc_id or index["subnet_vpc"].get(subnet_id))
+    return [main_route_table] if main_route_table else []
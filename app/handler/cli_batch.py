@@ -0,0 +1,78 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from collectors.cli_handler import run_cli_collector
+from filters.cli_filter import run_cli_filter
+from filters.cli_existing import handle_existing_resources, add_new_resources
+from filters.filterling_handler import run_filtering
+from filters.components import ComponentIndex
+from filters.graph_index import GraphIndex
+from filters.attack_paths import AttackPathIndex, find_attack_paths
+from filters.reachability import ReachabilityIndex
+
+#CLI 하나를 수집된 스냅샷(raw data, 정규화 데이터) 위에 반영하여 CLI node 기준 subgraph 반환
+#스냅샷은 수정하지 않으므로 같은 스냅샷으로 여러 CLI를 평가할 수 있음
+#components는 스냅샷의 기본 그래프로 만든 연결 요소 인덱스 (있으면 subgraph 추출에 사용)
+#extract_options는 subgraph 추출 범위 제한 (max_hops, relations, direction, node_budget -> run_filtering)
+#path_options가 있으면 CLI node에서 민감 리소스까지의 공격 경로도 함께 반환 (k, mode, max_depth -> find_attack_paths, attack_index는 스냅샷 그래프로 만든 인덱스)
+#escalation_reach가 True이면 CLI node에서 권한 상승 edge로 도달 가능한 node 목록도 함께 반환 (reachability는 스냅샷 그래프로 만든 인덱스, 없으면 새로 계산)
+def evaluate_cli_input(cli_input: str, account_id: str, raw_data: Dict[str, Any], normalized_data: Dict[str, Any],
+                       build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]], components: Optional[ComponentIndex] = None,
+                       extract_options: Optional[Dict[str, Any]] = None, path_options: Optional[Dict[str, Any]] = None,
+                       escalation_reach: bool = False, reachability: Optional[ReachabilityIndex] = None,
+                       attack_index: Optional[AttackPathIndex] = None) -> Dict[str, Any]:
+    #CLI 노드 생성
+    cli_graph = run_cli_collector(cli_input, account_id)
+    errors = cli_graph.get("errors") or [] #파싱에 실패한 명령어 (스크립트의 나머지 명령어는 그대로 평가)
+    if not cli_graph["nodes"]: #파싱에 실패한 CLI는 빈 결과 반환
+        return {"nodes": [], "edges": [], "cli_errors": errors} if errors else {"nodes": [], "edges": []}
+
+    #생성된 CLI 노드가 기존에 존재하는 리소스인지, 새로 추가되는 리소스인지 Node ID를 기준으로 판별
+    cli_node_filter = run_cli_filter(normalized_data, cli_graph)
+
+    if cli_node_filter["existing"]: #기존에 존재하는 Node와 ID가 같다면
+        normalized_data, raw_data = handle_existing_resources(cli_node_filter["existing"], normalized_data, raw_data) #기존 node에 CLI 내용을 병합한 overlay (raw data도 같은 내용으로 덮어씀)
+    if cli_node_filter["new"]: #새롭게 생성되는 리소스라면
+        normalized_data = add_new_resources(cli_node_filter["new"], normalized_data) #전체 정규화 node에 cli 정규화 node를 추가한 overlay (raw data는 기존 raw data 그대로)
+
+    graph_data = build_graph(raw_data, normalized_data) #cli 내용이 반영된 raw 데이터와 정규화 데이터를 이용해 edge 생성
+
+    start_node_ids = [node["node_id"] for node in cli_graph["nodes"]] #cli node들의 id를 start node id로 지정 (스크립트라면 바뀐 리소스 전체)
+
+    if path_options is None:
+        result = run_filtering(graph_data, start_node_ids, components=components, **(extract_options or {})) #start node들을 기준으로 직접, 간접 연결된 node, edge만 추출
+    else:
+        graph_index = GraphIndex(graph_data.get("nodes", []), graph_data.get("edges", [])) #subgraph 추출과 경로 탐색이 같이 사용
+        result = run_filtering(graph_data, start_node_ids, graph_index=graph_index, components=components, **(extract_options or {}))
+        result["attack_paths"] = find_attack_paths(graph_data, start_node_ids, index=graph_index, base=attack_index, **path_options) #start node에서 민감 리소스까지의 경로 top-k
+
+    if escalation_reach: #스냅샷 인덱스에 CLI로 추가된 권한 상승 edge만 반영하여 조회
+        reach_index = reachability.overlay(graph_data) if reachability is not None else ReachabilityIndex.from_graph(graph_data)
+        result["escalation_reach"] = reach_index.reachable(start_node_ids)
+    if errors:
+        result["cli_errors"] = errors
+    return result
+
+#여러 CLI를 같은 스냅샷에 대해 각각 평가 (수집/정규화는 호출한 쪽에서 한 번만 수행)
+#max_workers가 1보다 크면 CLI별 평가를 스레드 풀에서 동시에 실행
+def evaluate_cli_batch(cli_inputs: List[str], account_id: str, raw_data: Dict[str, Any], normalized_data: Dict[str, Any],
+                       build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]], max_workers: int = 1,
+                       components: Optional[ComponentIndex] = None, extract_options: Optional[Dict[str, Any]] = None,
+                       path_options: Optional[Dict[str, Any]] = None, escalation_reach: bool = False,
+                       reachability: Optional[ReachabilityIndex] = None, attack_index: Optional[AttackPathIndex] = None) -> List[Dict[str, Any]]:
+    def evaluate(cli_input):
+        return evaluate_cli_input(cli_input, account_id, raw_data, normalized_data, build_graph, components, extract_options, path_options,
+                                  escalation_reach, reachability, attack_index)
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(evaluate, cli_inputs))
+    else:
+        results = [evaluate(cli_input) for cli_input in cli_inputs]
+
+    #입력 순서대로 CLI와 해당 subgraph를 묶어서 반환
+    return [
+        {"cli_input": cli_input, **result}
+        for cli_input, result in zip(cli_inputs, results)
+    ]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+import threading
+import time
+
+from filters.attack_paths import AttackPathIndex
+from filters.components import ComponentIndex
+from filters.graph_delta import GraphDiff
+from filters.reachability import ReachabilityIndex
+
+#기본 캐시 유지 시간 (초, 0이면 캐시를 사용하지 않고 매번 수집 -> 이벤트의 cache_ttl로 지정했을 때만 사용)
+DEFAULT_TTL = 0
+#기본 최대 캐시 항목 수 (가장 오래 사용하지 않은 항목부터 제거)
+DEFAULT_MAX_ENTRIES = 16
+
+#캐시에 저장되는 수집 결과 (raw data + 정규화 데이터)
+#캐시된 값은 여러 호출이 공유하므로 직접 수정하지 않음 (CLI 내용은 filters.overlay로 얹어서 반영)
+class Snapshot:
+    def __init__(self, raw: Dict[str, Any], normalized: Dict[str, Any]):
+        self.raw = raw
+        self.normalized = normalized
+        self.stored_at = time.monotonic()
+        self._graph = None
+        self._diff = None
+        self._components = None
+        self._reachability = None
+        self._attack_paths = None
+        self._lock = threading.RLock()
+
+    #스냅샷(CLI 반영 전)으로 만든 그래프 (처음 요청할 때 한 번만 생성, 연결 요소/도달 가능성 인덱스가 같이 사용)
+    def graph(self, build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            if self._graph is None:
+                self._graph = build_graph(self.raw, self.normalized)
+            return self._graph
+
+    #스냅샷 그래프와 CLI overlay 그래프의 비교용 정보 (처음 요청할 때 한 번만 생성, 연결 요소 인덱스와 공격 경로 인덱스가 같이 사용)
+    def diff(self, build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> GraphDiff:
+        with self._lock:
+            if self._diff is None:
+                self._diff = GraphDiff(self.graph(build_graph))
+            return self._diff
+
+    #스냅샷 그래프의 연결 요소 인덱스 (처음 요청할 때 한 번만 생성)
+    def components(self, build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> ComponentIndex:
+        with self._lock:
+            if self._components is None:
+                self._components = ComponentIndex(self.graph(build_graph), self.diff(build_graph))
+            return self._components
+
+    #스냅샷 그래프의 권한 상승 도달 가능성 인덱스 (처음 요청할 때 한 번만 생성, CLI별로는 overlay로 갱신한 인덱스 사용)
+    def reachability(self, build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> ReachabilityIndex:
+        with self._lock:
+            if self._reachability is None:
+                self._reachability = ReachabilityIndex.from_graph(self.graph(build_graph), self.diff(build_graph))
+            return self._reachability
+
+    #스냅샷 그래프의 공격 경로 인덱스 (처음 요청할 때 한 번만 생성, sink까지의 거리도 인덱스에 한 번만 계산되고 CLI별로는 overlay로 얹은 인덱스 사용)
+    def attack_paths(self, build_graph: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> AttackPathIndex:
+        with self._lock:
+            if self._attack_paths is None:
+                diff = self.diff(build_graph)
+                self._attack_paths = AttackPathIndex(diff.index, diff=diff)
+            return self._attack_paths
+
+#Lambda 컨테이너(프로세스) 단위의 수집 결과 캐시
+#- (계정 id, 리전, 수집 옵션) 기준으로 저장하고 ttl이 지나면 다시 수집 (ttl이 없거나 0 이하이면 캐시를 사용하지 않음)
+#- max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+class SnapshotCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, ttl: Optional[float] = DEFAULT_TTL) -> Optional[Snapshot]:
+        if not ttl or ttl <= 0:
+            return None
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                return None
+            if time.monotonic() - snapshot.stored_at > ttl: #만료된 항목은 제거
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key) #최근 사용 표시
+            return snapshot
+
+    def put(self, key: tuple, raw: Dict[str, Any], normalized: Dict[str, Any]) -> Snapshot:
+        snapshot = Snapshot(raw, normalized)
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+#프로세스 전체에서 공유하는 캐시 (웜 컨테이너에서 다음 호출이 재사용)
+snapshot_cache = SnapshotCache()
+
+#캐시 키 (수집 대상과 수집 결과의 내용을 바꾸는 옵션을 포함)
+#- iam_mode: IAM 수집기 (bulk와 per_entity는 수집되는 필드가 다름)
+#- role_name, external_id: 멀티 계정 모드에서 AssumeRole하는 Role과 ExternalId (수집 권한이 달라짐)
+#- 동시 실행 수, 속도 제한, 재시도 예산, 정책/증분 수집 디스크 캐시 경로는 수집 속도만 바꾸므로 제외
+def snapshot_key(event: Dict[str, Any]) -> tuple:
+    return (
+        tuple(event.get("account_ids") or [event.get("account_id")]),
+        tuple(event.get("regions") or [event.get("region")]),
+        event.get("role_name"),
+        event.get("external_id"),
+        event.get("iam_mode"),
+        event.get("policy_versions"),
+        event.get("ec2_skip_inactive")
+    )
@@ -3,53 +3,151 @@ import json
 from datetime import datetime
 
 from collectors.collector_handler import handler as run_collectors
-from collectors.cli_handler import run_cli_collector
-from normalizers.normalizer_handler import run_normalizers
-from graph_builder.graph_handler import run_graph_builder
-from filters.cli_filter import run_cli_filter
-from filters.cli_existing import handle_existing_resources
-from filters.filterling_handler import run_filtering 
+from collectors.collector_handler import handler_multi_region as run_collectors_multi_region
+from collectors.collector_handler import handler_multi_account as run_collectors_multi_account
+from normalizers.normalizer_handler import run_normalizers, run_normalizers_multi_region, run_normalizers_multi_account
+from graph_builder.graph_handler import run_graph_builder, run_graph_builder_multi_region, run_graph_builder_multi_account
+from handler.snapshot_cache import Snapshot, snapshot_cache, snapshot_key, DEFAULT_TTL
+from handler.cli_batch import evaluate_cli_input, evaluate_cli_batch
+from filters.filter import is_bounded
 
 def lambda_handler(event, context):
     region = event.get("region", "us-east-1")
     cli_input = event.get("cli_input", "")
     account_id = event.get("account_id", "")
+    regions = event.get("regions") #여러 리전을 한 번에 수집하는 경우 리전 목록
+    account_ids = event.get("account_ids") #여러 계정을 한 번에 수집하는 경우 계정 목록 (각 계정의 role_name Role을 AssumeRole하여 수집)
     
     session = boto3.Session(region_name=region) #전달받은 리전으로 boto3 session 만들어두기
     
+    event_input = event
     event = { 
         "region": region,
         "cli_input": cli_input,
-        "account_id": account_id
+        "account_id": account_id,
+        "concurrent": event.get("concurrent", False), #서비스별 동시 수집 여부
+        "max_workers": event.get("max_workers", 8), #동시 수집 시 최대 워커 수
+        "iam_max_workers": event.get("iam_max_workers", 1), #IAM User 상세 조회 동시 실행 수
+        "iam_mode": event.get("iam_mode", "per_entity"), #IAM 수집 방식 ("bulk"이면 GetAccountAuthorizationDetails 사용)
+        "policy_cache_dir": event.get("policy_cache_dir"), #관리형 정책 문서 디스크 캐시 경로 (예: /tmp/policy_cache, 없으면 메모리 캐시만 사용)
+        "policy_versions": event.get("policy_versions", "all"), #"default"이면 관리형 정책의 Default 버전 문서만 수집
+        "ec2_max_workers": event.get("ec2_max_workers", 1), #EC2 user data 동시 조회 수
+        "ec2_skip_inactive": event.get("ec2_skip_inactive", False), #중지/종료된 EC2의 user data 조회 생략 여부
+        "rate_limit": event.get("rate_limit", True), #서비스별 속도 제한 + 재시도 예산 사용 여부
+        "rate_limits": event.get("rate_limits"), #서비스별 초당 요청 수 (예: {"iam": 5}, 없으면 기본값)
+        "retry_budget": event.get("retry_budget", 500), #수집 전체의 재시도 예산 (토큰 수)
+        "snapshot_dir": event.get("snapshot_dir") #증분 수집용 이전 수집 결과 저장 경로 (예: /tmp/snapshots, 없으면 매번 전체 수집)
     }
     
-    #AWS API 호출
-    raw_data = run_collectors(event, session)
-    
-    #Node 정규화
-    normalized_data = run_normalizers(raw_data)
+    if regions:
+        event["regions"] = regions
+        event["region_max_workers"] = len(regions)
 
-    #CLI 노드 생성
-    cli_graph = run_cli_collector(cli_input, account_id)
-    
-    #생성된 CLI 노드가 기존에 존재하는 리소스인지, 새로 추가되는 리소스인지 Node ID를 기준으로 판별
-    cli_node_filter = run_cli_filter(normalized_data, cli_graph)
-    
-    if cli_node_filter["existing"]: #기존에 존재하는 Node와 ID가 같다면
-        print("existing")
-        cli_and_normalized, cli_and_raw_data = handle_existing_resources(cli_node_filter["existing"], normalized_data, raw_data) #덮어쓰기 or Node에 내용 추가 후 Edge 생성으로 넘어갈 예정
-        graph_data = run_graph_builder(cli_and_raw_data, cli_and_normalized) #cli raw가 포함된 전체 raw 데이터와 cli node가 포함된 전체 정규화 데이터를 이용해 edge 생성
-    if cli_node_filter["new"]: #새롭게 생성되는 리소스라면
-        print("new")
-        normalized_data["nodes"].extend(cli_node_filter["new"]) #전체 정규화 node에 cli 정규화 node를 포함하여
-        graph_data = run_graph_builder(raw_data, normalized_data) #raw data는 기존 raw data만 넘기지만, 정규화 데이터는 cli node가 포함된 값만 넘김
-            
-    start_node_id = cli_graph["nodes"][0]["node_id"] #cli node의 id를 추출하여 start node id로 지정
-    
-    filtering_data = run_filtering(graph_data, start_node_id) #start node를 기준으로 직접, 간접 연결된 node, edge만 추출
+    if account_ids: #멀티 계정 모드 (계정별 수집 결과를 하나의 그래프로 병합)
+        if not event_input.get("role_name"): #AssumeRole할 Role 이름이 없으면 수집하지 않고 오류 반환
+            return {"error": "role_name is required when account_ids is given"}
+        event["account_ids"] = account_ids
+        event["role_name"] = event_input["role_name"] #각 계정에서 AssumeRole할 Role 이름
+        event["external_id"] = event_input.get("external_id") #AssumeRole 시 ExternalId (필요한 경우)
+        event["account_max_workers"] = event_input.get("account_max_workers", 10) #동시에 수집할 최대 계정 수
+        build_graph = run_graph_builder_multi_account
+    elif regions: #멀티 리전 모드 (IAM은 한 번만 수집하고 리전별 결과를 하나의 그래프로 병합)
+        build_graph = run_graph_builder_multi_region
+    else:
+        build_graph = run_graph_builder
+
+    #cache_ttl(초)을 지정한 호출만 캐시 사용: 같은 계정/리전을 cache_ttl초 이내에 수집했다면 웜 컨테이너에 남아있는 결과를 재사용 (응답에 cached: true)
+    cache_key = snapshot_key(event)
+    cache_ttl = event_input.get("cache_ttl", DEFAULT_TTL) or 0
+    snapshot = snapshot_cache.get(cache_key, cache_ttl)
+    reused = snapshot is not None
+    if snapshot is None:
+        raw_data, normalized_data = collect_and_normalize(event, session)
+        if cache_ttl <= 0 or raw_data.get("errors"): #캐시를 사용하지 않는 호출이거나, 수집하지 못한 계정이 있어 일부만 수집된 결과이면 캐시하지 않음
+            snapshot = Snapshot(raw_data, normalized_data)
+        else:
+            snapshot = snapshot_cache.put(cache_key, raw_data, normalized_data)
+    collection_errors = snapshot.raw.get("errors") or {} #계정 id -> 수집 실패 사유 (멀티 계정 모드, 응답에 함께 반환)
+
+    #캐시된 스냅샷은 수정하지 않고 CLI로 바뀐 내용만 overlay로 얹어서 사용
+    raw_data, normalized_data = snapshot.raw, snapshot.normalized
+
+    #subgraph 추출 범위 제한 (지정하지 않으면 CLI node와 연결된 연결 요소 전체)
+    extract_options = {
+        "max_hops": event_input.get("max_hops"), #CLI node로부터 최대 edge 수
+        "relations": event_input.get("relations"), #따라갈 relation 목록 (예: ["ASSUME_ROLE", "IAM_USER_CAN_PASS_ROLE"])
+        "direction": event_input.get("direction", "both"), #"out"이면 directed edge를 src -> dst 방향으로만 따라감 ("in"은 반대)
+        "node_budget": event_input.get("node_budget") #포함할 최대 node 수 (CLI node에서 가까운 node부터)
+    }
+    bounded = is_bounded(**extract_options) #범위 제한이 있으면 연결 요소 인덱스 대신 제한 조건으로 탐색
+
+    #공격 경로 탐색 옵션 (예: {"k": 5, "mode": "risk", "max_depth": 8}, true이면 기본값, 없으면 탐색하지 않음)
+    path_options = event_input.get("attack_paths")
+    if path_options is True:
+        path_options = {}
+    elif not isinstance(path_options, dict):
+        path_options = None
+
+    escalation_reach = bool(event_input.get("escalation_reach")) #true이면 CLI node에서 권한 상승 edge(AssumeRole, PassRole 등)로 도달 가능한 node 목록 반환
+
+    cli_inputs = event_input.get("cli_inputs") #여러 CLI를 같은 스냅샷에 대해 각각 평가하는 경우 CLI 목록
+    if cli_inputs:
+        response = {
+            "schema_version": "1.5",
+            "results": evaluate_cli_batch(cli_inputs, account_id, raw_data, normalized_data, build_graph, event_input.get("batch_max_workers", 1),
+                                          None if bounded else snapshot.components(build_graph), extract_options, path_options,
+                                          escalation_reach, snapshot.reachability(build_graph) if escalation_reach else None,
+                                          snapshot.attack_paths(build_graph) if path_options is not None else None) #CLI별 subgraph (입력 순서 유지), 연결 요소, 도달 가능성, sink까지의 거리는 스냅샷당 한 번만 계산
+        }
+        if collection_errors:
+            response["collection_errors"] = collection_errors
+        if reused:
+            response["cached"] = True #캐시된 스냅샷(이전 호출에서 수집한 결과)으로 평가
+        return response
+
+    #스냅샷을 재사용하는 호출이면 스냅샷에 저장된 연결 요소 인덱스 사용 (새로 수집한 경우 CLI 하나를 위해 그래프를 한 번 더 만들지 않음)
+    components = snapshot.components(build_graph) if reused and not bounded else None
+    reachability = snapshot.reachability(build_graph) if reused and escalation_reach else None
+    attack_index = snapshot.attack_paths(build_graph) if reused and path_options is not None else None
+
+    #CLI 노드 생성 -> 기존/신규 리소스 판별 -> overlay 반영 -> edge 생성 -> start node 기준 subgraph 추출
+    filtering_data = evaluate_cli_input(cli_input, account_id, raw_data, normalized_data, build_graph, components, extract_options, path_options,
+                                        escalation_reach, reachability, attack_index)
+    if collection_errors:
+        filtering_data["collection_errors"] = collection_errors
+    if reused:
+        filtering_data["cached"] = True #캐시된 스냅샷(이전 호출에서 수집한 결과)으로 평가
     
     return filtering_data
 
+#AWS API 호출 + Node 정규화 (event의 account_ids, regions에 따라 멀티 계정/멀티 리전 모드로 수집)
+def collect_and_normalize(event, session):
+    if event.get("account_ids"):
+        #AWS API 호출
+        raw_data = run_collectors_multi_account(event, session)
+
+        #Node 정규화
+        normalized_data = run_normalizers_multi_account(raw_data)
+
+        #CLI 대상 계정의 IAM raw data를 최상위에도 연결해둠 (기존 리소스 덮어쓰기 단계에서 사용, 같은 객체를 공유)
+        cli_account = raw_data["accounts"].get(event["account_id"], {})
+        raw_data["iam_user"] = cli_account.get("iam_user", {})
+        raw_data["iam_role"] = cli_account.get("iam_role", {})
+    elif event.get("regions"):
+        #AWS API 호출
+        raw_data = run_collectors_multi_region(event, session)
+
+        #Node 정규화
+        normalized_data = run_normalizers_multi_region(raw_data)
+    else:
+        #AWS API 호출
+        raw_data = run_collectors(event, session)
+        
+        #Node 정규화
+        normalized_data = run_normalizers(raw_data)
+
+    return raw_data, normalized_data
+
 if __name__ == "__main__": #테스트용 실행 코드
     test_event = {
         "cli_input": "aws iam put-user-policy --user-name manager_cgiddd7ga7gjim --policy-name cg-rotation-scenario --policy-document '{\"Version\": \"2012-10-17\",\"Statement\": [{\"Effect\": \"Allow\",\"Action\": [\"iam:CreateAccessKey\",\"iam:DeleteAccessKey\"],\"Resource\": \"*\"}]}'",
@@ -39,3 +39,38 @@ def run_normalizers(collected: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     return normalized_map
+
+#여러 리전의 수집 결과(handler_multi_region 반환값)를 하나의 정규화 그래프로 병합
+#- 리전 서비스의 node id에는 이미 리전이 포함되어 있으므로 그대로 합침
+#- IAM(글로벌) node는 모든 리전 결과에 들어있으므로 첫 번째 리전에서만 정규화
+def run_normalizers_multi_region(collected: Dict[str, Any]) -> Dict[str, Any]:
+    nodes = []
+    for index, region_collected in enumerate(collected["regions"].values()):
+        if index > 0:
+            region_collected = {**region_collected, "iam_user": {}, "iam_role": {}}
+        nodes.extend(run_normalizers(region_collected)["nodes"])
+
+    return {
+        "schema_version": "1.0",
+        "account_id": collected["account_id"],
+        "regions": list(collected["regions"].keys()),
+        "collected_at": collected["collected_at"],
+        "nodes": nodes
+    }
+
+#여러 계정의 수집 결과(handler_multi_account 반환값)를 하나의 정규화 그래프로 병합
+#- node id에 계정 id가 포함되어 있으므로 계정별 정규화 결과를 그대로 합침
+def run_normalizers_multi_account(collected: Dict[str, Any]) -> Dict[str, Any]:
+    nodes = []
+    for account_collected in collected["accounts"].values():
+        if "regions" in account_collected: #계정별로 여러 리전을 수집한 경우
+            nodes.extend(run_normalizers_multi_region(account_collected)["nodes"])
+        else:
+            nodes.extend(run_normalizers(account_collected)["nodes"])
+
+    return {
+        "schema_version": "1.0",
+        "account_ids": list(collected["accounts"].keys()),
+        "collected_at": collected["collected_at"],
+        "nodes": nodes
+    }